@@ -0,0 +1,236 @@
+"""
+Query Generator Benchmark Suite
+
+Goal: Measure how much the query generators cost on their own and how the
+      statements they produce perform end to end against SQLite.
+
+Use Case: Useful for catching performance regressions: write the results of two
+          commits to JSON and compare them with --compare.
+
+Suites:
+- generate: time and tracemalloc peak of generate_insert_query and
+  iter_insert_chunks for 1 to --max-rows rows, plus the per-call cost of the
+  single-row SELECT/UPDATE/DELETE generators and TemplateCache.
+- execute: inserting the same rows into an in-memory and an on-disk SQLite
+  database with one execute per row, executemany, and multi-row VALUES chunks.
+
+Note: Timings are the best of --repeat runs; memory peaks come from a separate
+run with tracemalloc enabled, since tracing slows everything down.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --max-rows 100000 --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+from typing import Callable, Dict, Iterable, List, Tuple
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from delete import generate_delete_query
+from insert_query import generate_insert_query, iter_insert_chunks, sqlite_max_params
+from select import generate_select_query
+from template_cache import TemplateCache
+from update_query import generate_update_query
+
+COLUMNS = ["id", "name", "email"]
+
+
+def make_rows(num_rows: int) -> List[Tuple[object, ...]]:
+    return [(i, f"user{i}", f"user{i}@example.com") for i in range(num_rows)]
+
+
+def row_counts(max_rows: int) -> List[int]:
+    """Powers of ten from 1 up to max_rows."""
+    counts = []
+    count = 1
+    while count <= max_rows:
+        counts.append(count)
+        count *= 10
+    return counts
+
+
+def best_time(func: Callable[[], object], repeat: int, number: int = 1) -> float:
+    """Best wall-clock seconds per call over repeat batches of number calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started_at) / number)
+    return best
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Peak bytes allocated while func runs."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def result(suite: str, case: str, rows: int, seconds: float, **extra) -> Dict[str, object]:
+    entry = {
+        "suite": suite,
+        "case": case,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else None,
+    }
+    entry.update(extra)
+    return entry
+
+
+def generation_suite(max_rows: int, repeat: int) -> List[Dict[str, object]]:
+    results = []
+    for num_rows in row_counts(max_rows):
+        rows = make_rows(num_rows)
+        number = max(1, 10_000 // num_rows)
+        cases = {
+            "generate_insert_query": lambda: generate_insert_query("users", COLUMNS, rows),
+            "iter_insert_chunks": lambda: list(iter_insert_chunks("users", COLUMNS, iter(rows))),
+        }
+        for case, func in cases.items():
+            seconds = best_time(func, repeat, number)
+            results.append(result(
+                "generate", case, num_rows, seconds, peak_bytes=peak_memory(func)
+            ))
+            print(f"  generate {case:<24} {num_rows:>9,} rows: {seconds * 1000:10.3f} ms")
+
+    cache = TemplateCache()
+    calls = {
+        "generate_select_query": lambda: generate_select_query(
+            "users", ["name", "email"], [("id", 1)]
+        ),
+        "generate_update_query": lambda: generate_update_query(
+            "users", {"email": "new@example.com"}, [("id", 1)]
+        ),
+        "generate_delete_query": lambda: generate_delete_query("users", [("id", 1)]),
+        "TemplateCache.select": lambda: cache.select("users", ["name", "email"], [("id", 1)]),
+    }
+    for case, func in calls.items():
+        seconds = best_time(func, repeat, 10_000)
+        results.append(result("generate", case, 1, seconds))
+        print(f"  generate {case:<24} {1:>9,} rows: {seconds * 1e6:10.3f} us")
+    return results
+
+
+def _insert_per_row(conn: sqlite3.Connection, rows: Iterable[Tuple[object, ...]]) -> None:
+    for row in rows:
+        conn.execute(*generate_insert_query("users", COLUMNS, [row]))
+
+
+def _insert_executemany(conn: sqlite3.Connection, rows: Iterable[Tuple[object, ...]]) -> None:
+    conn.executemany("INSERT INTO users (id, name, email) VALUES (?, ?, ?);", rows)
+
+
+def _insert_multi_row(conn: sqlite3.Connection, rows: Iterable[Tuple[object, ...]]) -> None:
+    for query, params in iter_insert_chunks("users", COLUMNS, rows, sqlite_max_params(conn)):
+        conn.execute(query, params)
+
+
+def execution_suite(max_rows: int, repeat: int) -> List[Dict[str, object]]:
+    strategies = {
+        "per_row_execute": _insert_per_row,
+        "executemany": _insert_executemany,
+        "multi_row_values": _insert_multi_row,
+    }
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        targets = {
+            "memory": ":memory:",
+            "disk": os.path.join(tmp_dir, "benchmark.db"),
+        }
+        for database, path in targets.items():
+            for num_rows in row_counts(max_rows):
+                rows = make_rows(num_rows)
+                for case, insert in strategies.items():
+                    def run():
+                        if path != ":memory:" and os.path.exists(path):
+                            os.remove(path)
+                        conn = sqlite3.connect(path)
+                        conn.execute("CREATE TABLE users (id INTEGER, name TEXT, email TEXT);")
+                        with conn:
+                            insert(conn, rows)
+                        conn.close()
+
+                    seconds = best_time(run, repeat)
+                    results.append(result("execute", case, num_rows, seconds, database=database))
+                    print(
+                        f"  execute  {database:<6} {case:<17} {num_rows:>9,} rows: "
+                        f"{num_rows / seconds:>12,.0f} rows/s"
+                    )
+    return results
+
+
+def compare(current: List[Dict[str, object]], baseline_path: str) -> None:
+    """Print the speed ratio of every case that also appears in the baseline file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    def key(entry):
+        return entry["suite"], entry["case"], entry.get("database"), entry["rows"]
+
+    previous = {key(entry): entry for entry in baseline}
+    print(f"\nCompared with {baseline_path} (>1.00 means faster now):")
+    for entry in current:
+        old = previous.get(key(entry))
+        if old is None:
+            continue
+        ratio = old["seconds"] / entry["seconds"]
+        marker = "  <-- slower" if ratio < 0.9 else ""
+        suite, case, database, rows = key(entry)
+        label = f"{suite} {database or ''} {case}".replace("  ", " ")
+        print(f"  {label:<40} {rows:>9,} rows: {ratio:5.2f}x{marker}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SQL query generators")
+    parser.add_argument(
+        "--max-rows", type=int, default=1_000_000,
+        help="Largest row count (row counts are powers of ten up to this value)",
+    )
+    parser.add_argument(
+        "--execute-max-rows", type=int, default=None,
+        help="Largest row count for the execute suite (defaults to --max-rows)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    parser.add_argument(
+        "--suite", choices=["all", "generate", "execute"], default="all",
+        help="Which suite to run",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    results: List[Dict[str, object]] = []
+    if args.suite in ("all", "generate"):
+        print("Generation suite")
+        results += generation_suite(args.max_rows, args.repeat)
+    if args.suite in ("all", "execute"):
+        print("Execution suite")
+        results += execution_suite(args.execute_max_rows or args.max_rows, args.repeat)
+
+    if args.output:
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "sqlite": sqlite3.sqlite_version,
+            # platform.platform() would import subprocess -> selectors -> select,
+            # which resolves to this folder's select.py.
+            "platform": sys.platform,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
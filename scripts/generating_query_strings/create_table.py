@@ -8,22 +8,16 @@ Use Case: Useful for schema generation tools, migration scripts, or ORM implemen
 
 Note: DB-API placeholders do not apply to table names, column names, or SQL type
 declarations, so this example focuses on identifier validation instead.
+generate_create_index_query builds the matching CREATE INDEX statements.
 
 Usage:
     python create_table.py
 """
-from typing import Dict
-import re
+from typing import Dict, Optional, Sequence
 
-IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+from schema import validate_identifier
 
 
-def validate_identifier(identifier: str, kind: str) -> str:
-    """Allow only simple SQL identifiers in this educational example."""
-    if not IDENTIFIER_RE.fullmatch(identifier):
-        raise ValueError(f"Invalid {kind}: {identifier!r}")
-    return identifier
-
 def generate_create_table_query(table_name: str, columns: Dict[str, str]) -> str:
     """
     Generate a SQL CREATE TABLE query for a given table name and column definitions.
@@ -59,6 +53,45 @@ def generate_create_table_query(table_name: str, columns: Dict[str, str]) -> str
 
     return query
 
+
+def generate_create_index_query(
+    table_name: str,
+    columns: Sequence[str],
+    index_name: Optional[str] = None,
+    unique: bool = False,
+) -> str:
+    """
+    Generate a SQL CREATE INDEX query on one or more columns of a table.
+
+    Args:
+    table_name (str): The name of the indexed table.
+    columns (Sequence[str]): Indexed columns, most selective equality columns first.
+    index_name (Optional[str]): Index name; defaults to idx_<table>_<columns>.
+    unique (bool): Whether to create a UNIQUE index.
+
+    Returns:
+    str: A SQL CREATE INDEX query string.
+
+    Example:
+    >>> generate_create_index_query("students", ["age", "name"])
+    "CREATE INDEX IF NOT EXISTS idx_students_age_name ON students (age, name);"
+    """
+    if not columns:
+        raise ValueError("CREATE INDEX requires at least one column")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_columns = [validate_identifier(column, "column name") for column in columns]
+    if index_name is None:
+        index_name = "_".join(["idx", safe_table_name, *safe_columns])
+    safe_index_name = validate_identifier(index_name, "index name")
+
+    unique_clause = "UNIQUE " if unique else ""
+    columns_clause = ", ".join(safe_columns)
+    return (
+        f"CREATE {unique_clause}INDEX IF NOT EXISTS {safe_index_name} "
+        f"ON {safe_table_name} ({columns_clause});"
+    )
+
 if __name__ == "__main__":
     table_columns = {
         "id": "INT PRIMARY KEY",
@@ -70,3 +103,4 @@ if __name__ == "__main__":
     # Expected output:
     # CREATE TABLE students (id INT PRIMARY KEY, name VARCHAR(100), age INT, email VARCHAR(100));
     print(generate_create_table_query("students", table_columns))
+    print(generate_create_index_query("students", ["age", "name"]))
@@ -7,22 +7,23 @@ Goal: Programmatically generate parameterized SQL DELETE statements with WHERE
 Use Case: Useful for building data cleanup scripts, admin tools, or API backends.
 
 Note: This implementation returns a SQL template plus parameters, which is the
-safe pattern supported by Python DB-API drivers.
+safe pattern supported by Python DB-API drivers. For mass deletes,
+delete_in_chunks pages through the primary key by keyset range or IN-list
+chunks and commits after each chunk, so the write lock is held briefly and the
+journal stays small.
 
 Usage:
     python delete.py
+    python delete.py --benchmark
 """
-from typing import List, Tuple
-import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
 
-IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
-
-
-def validate_identifier(identifier: str, kind: str) -> str:
-    """Allow only simple SQL identifiers in this educational example."""
-    if not IDENTIFIER_RE.fullmatch(identifier):
-        raise ValueError(f"Invalid {kind}: {identifier!r}")
-    return identifier
+from schema import validate_identifier
 
 
 def generate_delete_query(
@@ -54,12 +55,248 @@ def generate_delete_query(
 
     return query, params
 
+
+class DeleteStats(NamedTuple):
+    rows_deleted: int
+    chunks: int
+    elapsed: float
+    rows_per_second: float
+    max_lock_hold: float
+
+
+def _where_clause(conditions: Sequence[Tuple[str, object]], extra: Sequence[str]) -> str:
+    """AND together the key predicates and the validated equality conditions."""
+    predicates = list(extra)
+    predicates.extend(
+        f"{validate_identifier(column, 'column name')} = ?" for column, _ in conditions
+    )
+    return " AND ".join(predicates)
+
+
+def generate_range_delete_query(
+    table_name: str,
+    key_column: str,
+    lower: Optional[object],
+    upper: object,
+    conditions: Sequence[Tuple[str, object]] = (),
+) -> Tuple[str, Tuple[object, ...]]:
+    """
+    Generate a DELETE for the key range (lower, upper], optionally filtered.
+
+    Example:
+    >>> generate_range_delete_query("events", "id", 1000, 2000, [("status", "done")])
+    ("DELETE FROM events WHERE id > ? AND id <= ? AND status = ?;", (1000, 2000, "done"))
+    """
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_key = validate_identifier(key_column, "column name")
+    bounds = [f"{safe_key} <= ?"]
+    params: List[object] = [upper]
+    if lower is not None:
+        bounds.insert(0, f"{safe_key} > ?")
+        params.insert(0, lower)
+    where_clause = _where_clause(conditions, bounds)
+    params.extend(value for _, value in conditions)
+    return f"DELETE FROM {safe_table_name} WHERE {where_clause};", tuple(params)
+
+
+def generate_in_delete_query(
+    table_name: str,
+    key_column: str,
+    keys: Sequence[object],
+    conditions: Sequence[Tuple[str, object]] = (),
+) -> Tuple[str, Tuple[object, ...]]:
+    """
+    Generate a DELETE for an explicit list of keys, optionally filtered.
+
+    Example:
+    >>> generate_in_delete_query("events", "id", [3, 5, 8])
+    ("DELETE FROM events WHERE id IN (?, ?, ?);", (3, 5, 8))
+    """
+    if not keys:
+        raise ValueError("DELETE requires at least one key")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_key = validate_identifier(key_column, "column name")
+    in_clause = f"{safe_key} IN (" + ", ".join("?" for _ in keys) + ")"
+    where_clause = _where_clause(conditions, [in_clause])
+    params = tuple(keys) + tuple(value for _, value in conditions)
+    return f"DELETE FROM {safe_table_name} WHERE {where_clause};", params
+
+
+def delete_in_chunks(
+    conn: sqlite3.Connection,
+    table_name: str,
+    key_column: str,
+    conditions: Sequence[Tuple[str, object]] = (),
+    chunk_size: int = 1000,
+    mode: str = "range",
+    pause: float = 0.0,
+) -> DeleteStats:
+    """
+    Delete every matching row in key order, one short transaction per chunk.
+
+    The next chunk's keys are located with a read before the write lock is
+    taken, so each BEGIN IMMEDIATE ... COMMIT only covers the DELETE itself.
+
+    Args:
+    conn (sqlite3.Connection): Connection opened with isolation_level=None, so that
+                               each chunk controls its own transaction.
+    table_name (str): The name of the table from which to delete records.
+    key_column (str): An indexed, unique column to page through, usually the primary key.
+    conditions (Sequence[Tuple[str, object]]): Optional (column, value) equality filters.
+    chunk_size (int): Maximum number of keys per chunk.
+    mode (str): "range" deletes (lower, upper] key ranges; "in" deletes explicit
+                IN-lists of keys, so chunk_size must stay under the driver's
+                host-parameter limit.
+    pause (float): Seconds to sleep between chunks so other writers can get in.
+
+    Returns:
+    DeleteStats: Rows deleted, chunk count, elapsed seconds, rows/s and the
+                 longest time a chunk held the write lock.
+    """
+    if mode not in ("range", "in"):
+        raise ValueError(f"Unknown delete mode: {mode!r}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_key = validate_identifier(key_column, "column name")
+    condition_params = tuple(value for _, value in conditions)
+
+    def next_keys_query(after_key: Optional[object]) -> Tuple[str, Tuple[object, ...]]:
+        bounds = [] if after_key is None else [f"{safe_key} > ?"]
+        where_clause = _where_clause(conditions, bounds)
+        where = f" WHERE {where_clause}" if where_clause else ""
+        params = (() if after_key is None else (after_key,)) + condition_params
+        if mode == "range":
+            # The last key of the chunk, or the largest remaining key when
+            # fewer than chunk_size rows are left.
+            query = (
+                f"SELECT coalesce((SELECT {safe_key} FROM {safe_table_name}{where} "
+                f"ORDER BY {safe_key} LIMIT 1 OFFSET {chunk_size - 1}), "
+                f"(SELECT max({safe_key}) FROM {safe_table_name}{where}));"
+            )
+            return query, params + params
+        query = (
+            f"SELECT {safe_key} FROM {safe_table_name}{where} "
+            f"ORDER BY {safe_key} LIMIT {chunk_size};"
+        )
+        return query, params
+
+    rows_deleted = 0
+    chunks = 0
+    max_lock_hold = 0.0
+    last_key: Optional[object] = None
+    started_at = time.perf_counter()
+    while True:
+        if mode == "range":
+            upper = conn.execute(*next_keys_query(last_key)).fetchone()[0]
+            if upper is None:
+                break
+            query, params = generate_range_delete_query(
+                safe_table_name, safe_key, last_key, upper, conditions
+            )
+            last_key = upper
+        else:
+            keys = [row[0] for row in conn.execute(*next_keys_query(last_key))]
+            if not keys:
+                break
+            query, params = generate_in_delete_query(
+                safe_table_name, safe_key, keys, conditions
+            )
+            last_key = keys[-1]
+
+        lock_started_at = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            rows_deleted += conn.execute(query, params).rowcount
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+        max_lock_hold = max(max_lock_hold, time.perf_counter() - lock_started_at)
+        chunks += 1
+
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - started_at
+    rows_per_second = rows_deleted / elapsed if elapsed else 0.0
+    return DeleteStats(rows_deleted, chunks, elapsed, rows_per_second, max_lock_hold)
+
+
+def benchmark(num_rows: int, chunk_size: int) -> None:
+    """Delete half of an on-disk WAL table in one statement and in chunks."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "delete_benchmark.db")
+
+        def fresh_connection():
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            conn = sqlite3.connect(db_path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, status TEXT);")
+            conn.execute("BEGIN;")
+            conn.executemany(
+                "INSERT INTO events (id, status) VALUES (?, ?);",
+                ((i, "done" if i % 2 else "open") for i in range(num_rows)),
+            )
+            conn.execute("COMMIT;")
+            return conn
+
+        print(f"Deleting {num_rows // 2:,} of {num_rows:,} rows (chunk_size={chunk_size})")
+
+        conn = fresh_connection()
+        started_at = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE;")
+        deleted = conn.execute(*generate_delete_query("events", [("status", "done")])).rowcount
+        conn.execute("COMMIT;")
+        elapsed = time.perf_counter() - started_at
+        conn.close()
+        print(
+            f"  single statement: {deleted / elapsed:>12,.0f} rows/s, "
+            f"lock held {elapsed * 1000:.1f} ms"
+        )
+
+        for mode in ("range", "in"):
+            conn = fresh_connection()
+            stats = delete_in_chunks(
+                conn, "events", "id", [("status", "done")], chunk_size=chunk_size, mode=mode
+            )
+            conn.close()
+            label = f"{mode} chunks:"
+            print(
+                f"  {label:<17} {stats.rows_per_second:>12,.0f} rows/s, "
+                f"max lock held {stats.max_lock_hold * 1000:.1f} ms "
+                f"over {stats.chunks} chunks"
+            )
+
+
 if __name__ == "__main__":
-    delete_conditions = [
-        ("name", "John Doe"),
-        ("age", "20")
-    ]
-
-    query, params = generate_delete_query("students", delete_conditions)
-    print(query)
-    print(params)
+    parser = argparse.ArgumentParser(description="SQL DELETE query generator demo")
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare a single DELETE with chunked deletes on an on-disk SQLite database",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=500_000, help="Rows in the benchmark table"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=5_000, help="Keys per chunk in the benchmark"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows, args.chunk_size)
+    else:
+        delete_conditions = [
+            ("name", "John Doe"),
+            ("age", "20")
+        ]
+
+        query, params = generate_delete_query("students", delete_conditions)
+        print(query)
+        print(params)
+
+        print(*generate_range_delete_query("events", "id", 1000, 2000, [("status", "done")]))
+        print(*generate_in_delete_query("events", "id", [3, 5, 8]))
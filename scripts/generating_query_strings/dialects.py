@@ -0,0 +1,175 @@
+"""
+Dialect-Aware Placeholder Rendering
+
+Goal: Render the qmark ("?") templates produced by the query generators in the
+      placeholder style each DB-API driver expects, and route bulk inserts to the
+      fastest path each driver offers.
+
+Use Case: Useful when the same generated SQL must run on sqlite3, psycopg2 and
+          mysql-connector without hand-written string rewriting.
+
+Note: The generators only emit "?" as a placeholder, never inside literals,
+because every value is passed as a parameter and identifiers are validated.
+That makes a plain split on "?" safe. Rendered templates are cached, so each
+template is rewritten once per style no matter how often it is executed.
+
+Styles (PEP 249):
+- qmark:   WHERE a = ? AND b = ?        (sqlite3)
+- format:  WHERE a = %s AND b = %s      (psycopg2, mysql-connector)
+- numeric: WHERE a = :1 AND b = :2      (cx_Oracle / oracledb)
+- named:   WHERE a = :p1 AND b = :p2    (params passed as a dict)
+
+Bulk fast paths:
+- sqlite:   cursor.executemany with a single-row template
+- postgres: psycopg2.extras.execute_values, which sends pages of multi-row VALUES
+- mysql:    mysql-connector's executemany, which rewrites INSERTs into
+            multi-row statements on its own
+
+Usage:
+    python dialects.py
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Sequence, Tuple, Union
+import sqlite3
+
+from insert_query import _insert_template
+from schema import validate_identifier
+
+DIALECT_PARAMSTYLES = {
+    "sqlite": "qmark",
+    "postgres": "format",
+    "mysql": "format",
+    "oracle": "numeric",
+}
+
+Params = Union[Tuple[object, ...], Dict[str, object]]
+
+
+@lru_cache(maxsize=1024)
+def render_placeholders(query: str, paramstyle: str) -> str:
+    """
+    Rewrite the "?" placeholders of a generated template into another paramstyle.
+
+    Args:
+    query (str): A template produced by one of the generators.
+    paramstyle (str): "qmark", "format", "numeric" or "named".
+
+    Returns:
+    str: The template in the requested style.
+
+    Example:
+    >>> render_placeholders("SELECT name FROM students WHERE age = ? AND id = ?;", "numeric")
+    "SELECT name FROM students WHERE age = :1 AND id = :2;"
+    """
+    if paramstyle == "qmark":
+        return query
+
+    pieces = query.split("?")
+    if paramstyle == "format":
+        # A literal percent sign must be doubled in format-style templates.
+        return "%s".join(piece.replace("%", "%%") for piece in pieces)
+    if paramstyle == "numeric":
+        markers = [f":{index}" for index in range(1, len(pieces))]
+    elif paramstyle == "named":
+        markers = [f":p{index}" for index in range(1, len(pieces))]
+    else:
+        raise ValueError(f"Unsupported paramstyle: {paramstyle!r}")
+
+    rendered = [pieces[0]]
+    for marker, piece in zip(markers, pieces[1:]):
+        rendered.append(marker)
+        rendered.append(piece)
+    return "".join(rendered)
+
+
+def render_query(
+    query: str, params: Sequence[object], dialect: str
+) -> Tuple[str, Params]:
+    """
+    Render a generated (query, params) pair for a dialect's driver.
+
+    Args:
+    query (str): A template produced by one of the generators.
+    params (Sequence[object]): Its positional parameters.
+    dialect (str): A key of DIALECT_PARAMSTYLES, or a paramstyle name.
+
+    Returns:
+    Tuple[str, Params]: The rendered template and the parameters, as a dict for
+                        the named style and as a tuple otherwise.
+    """
+    paramstyle = DIALECT_PARAMSTYLES.get(dialect, dialect)
+    rendered = render_placeholders(query, paramstyle)
+    if paramstyle == "named":
+        return rendered, {f"p{index}": value for index, value in enumerate(params, 1)}
+    return rendered, tuple(params)
+
+
+def execute_bulk(
+    conn,
+    dialect: str,
+    table_name: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    page_size: int = 1000,
+) -> None:
+    """
+    Insert rows through the bulk fast path of the dialect's driver.
+
+    Args:
+    conn: An open sqlite3, psycopg2 or mysql-connector connection.
+    dialect (str): "sqlite", "postgres" or "mysql".
+    table_name (str): The name of the table where data will be inserted.
+    columns (Sequence[str]): Column names to insert into.
+    rows (Iterable[Sequence[object]]): Rows to insert; sqlite3 and psycopg2
+                            consume them lazily.
+    page_size (int): Rows per statement for psycopg2.extras.execute_values.
+
+    The caller is responsible for committing.
+    """
+    if dialect not in ("sqlite", "postgres", "mysql"):
+        raise ValueError(f"No bulk fast path for dialect: {dialect!r}")
+    if not columns:
+        raise ValueError("INSERT requires at least one column")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_columns = [validate_identifier(column, "column name") for column in columns]
+
+    if dialect == "postgres":
+        from psycopg2.extras import execute_values
+
+        columns_clause = ", ".join(safe_columns)
+        query = f"INSERT INTO {safe_table_name} ({columns_clause}) VALUES %s"
+        with conn.cursor() as cursor:
+            execute_values(cursor, query, rows, page_size=page_size)
+        return
+
+    query = render_placeholders(
+        _insert_template(safe_table_name, safe_columns, 1), DIALECT_PARAMSTYLES[dialect]
+    )
+    if dialect == "mysql":
+        # mysql-connector only batches INSERTs it can rewrite, and it needs a list.
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(query.rstrip(";"), list(rows))
+        finally:
+            cursor.close()
+    else:
+        conn.executemany(query, rows)
+
+
+if __name__ == "__main__":
+    template = "SELECT name, email FROM students WHERE age = ? AND grade = ?;"
+    for style in ("qmark", "format", "numeric", "named"):
+        print(f"{style:<8} {render_placeholders(template, style)}")
+
+    print(render_query(template, ("20", "A"), "postgres"))
+    print(render_query(template, ("20", "A"), "named"))
+    print(render_placeholders.cache_info())
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE users (first_name TEXT, last_name TEXT);")
+    execute_bulk(conn, "sqlite", "users", ["first_name", "last_name"],
+                 (("John", "Doe"), ("Jane", "Doe")))
+    conn.commit()
+    print(conn.execute("SELECT * FROM users;").fetchall())
+    conn.close()
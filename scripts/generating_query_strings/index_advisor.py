@@ -0,0 +1,261 @@
+"""
+Covering-Index Advisor
+
+Goal: Record the WHERE and ORDER BY columns of the statements that the query
+      generators actually produce, propose composite and covering indexes for
+      them, and check each proposal with EXPLAIN QUERY PLAN on a scratch copy of
+      a SQLite database.
+
+Use Case: Useful for deriving a schema's indexes from its real query shapes
+          instead of guessing, and for proving that a query goes from a full
+          SCAN to an index SEARCH before the index is created in production.
+
+Note: IndexAdvisor wraps the generators, so it returns exactly what they return
+while counting each shape. A proposed index puts the equality columns first,
+then the ORDER BY columns, then (for SELECTs) the remaining selected columns so
+that the index covers the query and the table itself is never read. Proposals
+that are a prefix of another proposal on the same table are dropped. Checks
+run on an in-memory backup, so the source database is left untouched.
+
+Usage:
+    python index_advisor.py
+"""
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import sqlite3
+
+from create_table import generate_create_index_query
+from delete import generate_delete_query
+from schema import validate_identifier
+from select import generate_keyset_select_query, generate_select_query
+from update_query import generate_update_query
+
+# Selected columns appended to make an index covering; wider rows are better
+# served by a plain composite index plus a table lookup.
+MAX_COVERING_EXTRA_COLUMNS = 3
+
+
+class QueryShape(NamedTuple):
+    table: str
+    equality_columns: Tuple[str, ...]
+    order_columns: Tuple[str, ...]
+    selected_columns: Tuple[str, ...]
+
+
+class PlanCheck(NamedTuple):
+    query: str
+    before: str
+    after: str
+
+    @property
+    def improved(self) -> bool:
+        return "SCAN" in self.before and "SEARCH" in self.after
+
+
+class IndexAdvisor:
+    """
+    Generator wrapper that records query shapes and proposes indexes for them.
+
+    Example:
+    >>> advisor = IndexAdvisor()
+    >>> advisor.select("students", ["name"], [("age", 20)])
+    ("SELECT name FROM students WHERE age = ?;", (20,))
+    >>> advisor.propose()
+    ["CREATE INDEX IF NOT EXISTS idx_students_age_name ON students (age, name);"]
+    """
+
+    def __init__(self):
+        self.shapes: "Counter[QueryShape]" = Counter()
+        self._queries: Dict[QueryShape, Tuple[str, int]] = {}
+
+    def record(
+        self,
+        table_name: str,
+        equality_columns: Sequence[str],
+        order_columns: Sequence[str] = (),
+        selected_columns: Sequence[str] = (),
+        query: Optional[str] = None,
+        param_count: int = 0,
+    ) -> None:
+        """Count one occurrence of a query shape, keeping an example query for checks."""
+        shape = QueryShape(
+            table_name, tuple(equality_columns), tuple(order_columns), tuple(selected_columns)
+        )
+        self.shapes[shape] += 1
+        if query is not None:
+            self._queries.setdefault(shape, (query, param_count))
+
+    def select(
+        self, table_name: str, columns: List[str], conditions: List[Tuple[str, object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        query, params = generate_select_query(table_name, columns, conditions)
+        selected = () if columns == ["*"] else columns
+        self.record(
+            table_name, [column for column, _ in conditions], (), selected, query, len(params)
+        )
+        return query, params
+
+    def keyset_select(
+        self,
+        table_name: str,
+        columns: List[str],
+        key_columns: Sequence[str],
+        conditions: Sequence[Tuple[str, object]] = (),
+        after: Optional[Sequence[object]] = None,
+        limit: int = 100,
+    ) -> Tuple[str, Tuple[object, ...]]:
+        query, params = generate_keyset_select_query(
+            table_name, columns, key_columns, conditions, after, limit
+        )
+        selected = () if columns == ["*"] else columns
+        self.record(
+            table_name, [column for column, _ in conditions], key_columns, selected,
+            query, len(params),
+        )
+        return query, params
+
+    def update(
+        self, table_name: str, data: Dict[str, object], conditions: List[Tuple[str, object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        query, params = generate_update_query(table_name, data, conditions)
+        self.record(
+            table_name, [column for column, _ in conditions], (), (), query, len(params)
+        )
+        return query, params
+
+    def delete(
+        self, table_name: str, conditions: List[Tuple[str, object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        query, params = generate_delete_query(table_name, conditions)
+        self.record(
+            table_name, [column for column, _ in conditions], (), (), query, len(params)
+        )
+        return query, params
+
+    def _index_columns(self, shape: QueryShape) -> Tuple[str, ...]:
+        columns = list(dict.fromkeys(shape.equality_columns + shape.order_columns))
+        extra = [column for column in shape.selected_columns if column not in columns]
+        if len(extra) <= MAX_COVERING_EXTRA_COLUMNS:
+            columns.extend(extra)
+        return tuple(columns)
+
+    def propose(self, conn: Optional[sqlite3.Connection] = None) -> List[str]:
+        """
+        Return CREATE INDEX statements for the recorded shapes, most frequent first.
+
+        With a SQLite connection, shapes already served by an existing index or
+        by an INTEGER PRIMARY KEY are skipped.
+        """
+        candidates: List[Tuple[str, Tuple[str, ...]]] = []
+        for shape, _ in self.shapes.most_common():
+            if not shape.equality_columns and not shape.order_columns:
+                continue
+            candidate = (shape.table, self._index_columns(shape))
+            if candidate not in candidates:
+                candidates.append(candidate)
+
+        def is_prefix(short: Tuple[str, ...], long: Tuple[str, ...]) -> bool:
+            return len(short) <= len(long) and long[:len(short)] == short
+
+        existing: Dict[str, List[Tuple[str, ...]]] = {}
+        if conn is not None:
+            for table_name in {table_name for table_name, _ in candidates}:
+                existing[table_name] = existing_indexes(conn, table_name)
+
+        proposals = []
+        for table_name, columns in candidates:
+            if any(
+                table_name == other_table and columns != other_columns
+                and is_prefix(columns, other_columns)
+                for other_table, other_columns in candidates
+            ):
+                continue
+            if any(is_prefix(columns, index) for index in existing.get(table_name, ())):
+                continue
+            proposals.append(generate_create_index_query(table_name, columns))
+        return proposals
+
+    def verify(
+        self, conn: sqlite3.Connection, proposals: Optional[Sequence[str]] = None
+    ) -> List[PlanCheck]:
+        """
+        Compare query plans before and after the proposed indexes on a scratch copy.
+
+        Args:
+        conn (sqlite3.Connection): Connection to the database to copy, with no open
+                                   write transaction.
+        proposals (Optional[Sequence[str]]): CREATE INDEX statements; defaults to
+                                    propose(conn).
+
+        Returns:
+        List[PlanCheck]: One entry per recorded query shape with its plan before and after.
+        """
+        if proposals is None:
+            proposals = self.propose(conn)
+
+        scratch = sqlite3.connect(":memory:")
+        try:
+            conn.backup(scratch)
+            before = {shape: self._plan(scratch, shape) for shape in self._queries}
+            for statement in proposals:
+                scratch.execute(statement)
+            scratch.execute("ANALYZE;")
+            return [
+                PlanCheck(self._queries[shape][0], before[shape], self._plan(scratch, shape))
+                for shape in self._queries
+            ]
+        finally:
+            scratch.close()
+
+    def _plan(self, conn: sqlite3.Connection, shape: QueryShape) -> str:
+        query, param_count = self._queries[shape]
+        # Parameter values do not influence the chosen plan shape, so binding NULLs is enough.
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", (None,) * param_count).fetchall()
+        return "; ".join(row[-1] for row in rows)
+
+
+def existing_indexes(conn: sqlite3.Connection, table_name: str) -> List[Tuple[str, ...]]:
+    """Column lists of a table's indexes, including its INTEGER PRIMARY KEY rowid alias."""
+    safe_table_name = validate_identifier(table_name, "table name")
+    indexes = []
+    table_info = conn.execute(f"PRAGMA table_info({safe_table_name});").fetchall()
+    primary_key = [row for row in table_info if row[5]]
+    if len(primary_key) == 1 and primary_key[0][2].upper() == "INTEGER":
+        indexes.append((primary_key[0][1],))
+    for index in conn.execute(f"PRAGMA index_list({safe_table_name});").fetchall():
+        # Index names come from the database and may need quoting; bind them instead.
+        info = conn.execute("SELECT * FROM pragma_index_info(?);", (index[1],)).fetchall()
+        indexes.append(tuple(row[2] for row in sorted(info)))
+    return indexes
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT, email TEXT, "
+        "age INTEGER, grade TEXT);"
+    )
+    conn.executemany(
+        "INSERT INTO students (name, email, age, grade) VALUES (?, ?, ?, ?);",
+        ((f"s{i}", f"s{i}@example.com", 18 + i % 10, "ABCDF"[i % 5]) for i in range(10_000)),
+    )
+    conn.commit()
+
+    advisor = IndexAdvisor()
+    for age in (19, 20, 21):
+        advisor.select("students", ["name", "email"], [("age", age)])
+    advisor.keyset_select("students", ["id", "name"], ["name", "id"], [("grade", "A")])
+    advisor.update("students", {"grade": "B"}, [("email", "s1@example.com")])
+    advisor.delete("students", [("id", 5)])
+
+    proposals = advisor.propose(conn)
+    for statement in proposals:
+        print(statement)
+
+    print()
+    for check in advisor.verify(conn, proposals):
+        status = "✓" if check.improved else "·"
+        print(f"{status} {check.query}")
+        print(f"    before: {check.before}")
+        print(f"    after:  {check.after}")
+    conn.close()
@@ -7,22 +7,48 @@ Goal: Programmatically generate parameterized SQL INSERT statements for multiple
 Use Case: Useful for ETL pipelines, data import tools, or seeding test databases.
 
 Note: This implementation returns a SQL template plus parameters, which is the
-safe pattern supported by Python DB-API drivers.
+safe pattern supported by Python DB-API drivers. For large inputs,
+iter_insert_chunks streams (sql, params) chunks that stay under the driver's
+host-parameter limit instead of building one huge statement, and
+generate_columnar_insert_query feeds executemany straight from column buffers
+such as array.array, memoryview or NumPy arrays.
 
 Usage:
     python insert_query.py
+    python insert_query.py --benchmark
 """
-from typing import List, Sequence, Tuple
-import re
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from array import array
+from operator import itemgetter
+import argparse
+import sqlite3
+import struct
+import time
 
-IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+from schema import validate_identifier
 
+# struct codes whose memoryview items unpack to plain Python int/float/bool.
+NATIVE_BUFFER_FORMATS = frozenset("bBhHiIlLqQnNfd?")
 
-def validate_identifier(identifier: str, kind: str) -> str:
-    """Allow only simple SQL identifiers in this educational example."""
-    if not IDENTIFIER_RE.fullmatch(identifier):
-        raise ValueError(f"Invalid {kind}: {identifier!r}")
-    return identifier
+
+# SQLite's default host-parameter limit before 3.32.0; newer builds allow 32766.
+SQLITE_MAX_VARIABLE_NUMBER = 999
+
+
+def sqlite_max_params(conn: sqlite3.Connection) -> int:
+    """Return the host-parameter limit of a SQLite connection."""
+    getlimit = getattr(conn, "getlimit", None)  # Python 3.11+
+    if getlimit is None:
+        return SQLITE_MAX_VARIABLE_NUMBER
+    return getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+
+def _insert_template(table_name: str, columns: Sequence[str], row_count: int) -> str:
+    """Build a multi-row INSERT template from already validated identifiers."""
+    row_placeholder = "(" + ", ".join("?" for _ in columns) + ")"
+    values_clause = ", ".join(row_placeholder for _ in range(row_count))
+    columns_clause = ", ".join(columns)
+    return f"INSERT INTO {table_name} ({columns_clause}) VALUES {values_clause};"
 
 
 def generate_insert_query(
@@ -68,21 +94,218 @@ def generate_insert_query(
         if len(row) != row_length:
             raise ValueError("Every INSERT row must match the number of columns")
 
-    row_placeholder = "(" + ", ".join("?" for _ in safe_columns) + ")"
-    values_clause = ", ".join(row_placeholder for _ in data)
-    columns_clause = ", ".join(safe_columns)
     params = tuple(value for row in data for value in row)
-    query = f"INSERT INTO {safe_table_name} ({columns_clause}) VALUES {values_clause};"
+    query = _insert_template(safe_table_name, safe_columns, len(data))
 
     return query, params
 
-if __name__ == "__main__":
-    insert_columns = ["first_name", "last_name", "email"]
-    sample_data = [
-        ["John", "Doe", "john.doe@example.com"],
-        ["Jane", "Doe", "jane.doe@example.com"],
+
+def iter_insert_chunks(
+    table_name: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    max_params: int = SQLITE_MAX_VARIABLE_NUMBER,
+) -> Iterator[Tuple[str, Tuple[object, ...]]]:
+    """
+    Stream parameterized multi-row INSERT statements for an iterable of rows.
+
+    Rows are consumed lazily, so generators and cursors work without the input
+    ever being materialized. Each chunk carries at most max_params parameters,
+    and every full chunk shares the same SQL template string; only the final,
+    partial chunk gets a shorter template.
+
+    Args:
+    table_name (str): The name of the table where data will be inserted.
+    columns (Sequence[str]): Column names to insert into.
+    rows (Iterable[Sequence[object]]): Any iterable of rows.
+    max_params (int): The driver's host-parameter limit, e.g. sqlite_max_params(conn).
+
+    Yields:
+    Tuple[str, Tuple[object, ...]]: A SQL template string and parameters tuple per chunk.
+
+    Example:
+    >>> list(iter_insert_chunks("users", ["name"], (["a"], ["b"], ["c"]), max_params=2))
+    [
+        ("INSERT INTO users (name) VALUES (?), (?);", ("a", "b")),
+        ("INSERT INTO users (name) VALUES (?);", ("c",)),
     ]
+    """
+    if not columns:
+        raise ValueError("INSERT requires at least one column")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_columns = [validate_identifier(column, "column name") for column in columns]
+
+    row_length = len(safe_columns)
+    rows_per_chunk = max_params // row_length
+    if rows_per_chunk < 1:
+        raise ValueError(
+            f"A single row needs {row_length} parameters, above the limit of {max_params}"
+        )
+
+    full_query: Optional[str] = None
+    params: List[object] = []
+    row_count = 0
+    for row in rows:
+        if len(row) != row_length:
+            raise ValueError("Every INSERT row must match the number of columns")
+        params.extend(row)
+        row_count += 1
+        if row_count == rows_per_chunk:
+            if full_query is None:
+                full_query = _insert_template(safe_table_name, safe_columns, rows_per_chunk)
+            yield full_query, tuple(params)
+            params = []
+            row_count = 0
+
+    if row_count:
+        yield _insert_template(safe_table_name, safe_columns, row_count), tuple(params)
+
+
+def _column_values(values: Sequence[object]) -> Iterable[object]:
+    """
+    Return an iterable of DB-API compatible scalars for one column.
+
+    Numeric buffers (array.array, NumPy arrays, bytes) are read through a
+    memoryview, which yields plain Python numbers without copying the buffer.
+    Buffers with an explicit byte order ('<i', '>d' from ctypes or non-native
+    NumPy arrays) cannot be iterated by memoryview, so they are unpacked with
+    struct. Anything else, such as a list of strings, is iterated as is.
+    """
+    try:
+        view = memoryview(values)  # type: ignore[arg-type]
+    except TypeError:
+        return values
+    if view.ndim != 1:
+        raise ValueError("Column buffers must be one-dimensional")
+    code = view.format[1:] if view.format[:1] == "@" else view.format
+    if code in NATIVE_BUFFER_FORMATS:
+        return view
+    if view.format[:1] in "=<>!" and view.format[1:] in NATIVE_BUFFER_FORMATS:
+        try:
+            return map(itemgetter(0), struct.iter_unpack(view.format, view.cast("B")))
+        except (struct.error, TypeError):
+            pass  # e.g. 'n' has no standard size, or the buffer is not contiguous
+    return values
+
+
+def generate_columnar_insert_query(
+    table_name: str, columns: Mapping[str, Sequence[object]]
+) -> Tuple[str, Iterator[Tuple[object, ...]]]:
+    """
+    Generate a single-row INSERT template plus a lazy row iterator from columns.
+
+    The row iterator zips the column buffers together, so executemany receives
+    one tuple per row and no transposed copy of the data is ever built. Column
+    lengths are validated once per column rather than once per row.
+
+    Args:
+    table_name (str): The name of the table where data will be inserted.
+    columns (Mapping[str, Sequence[object]]): Column names mapped to equally long
+                            sequences or buffers of values.
+
+    Returns:
+    Tuple[str, Iterator[Tuple[object, ...]]]: A SQL template string and a row iterator
+                            suitable for cursor.executemany.
+
+    Example:
+    >>> query, rows = generate_columnar_insert_query(
+            "readings", {"sensor_id": array("i", [1, 2]), "value": array("d", [0.5, 1.5])}
+        )
+    >>> query
+    "INSERT INTO readings (sensor_id, value) VALUES (?, ?);"
+    >>> list(rows)
+    [(1, 0.5), (2, 1.5)]
+    """
+    if not columns:
+        raise ValueError("INSERT requires at least one column")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_columns = [validate_identifier(column, "column name") for column in columns]
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError("Every INSERT column must have the same number of values")
+    if not lengths.pop():
+        raise ValueError("INSERT requires at least one row")
 
-    query, params = generate_insert_query("users", insert_columns, sample_data)
-    print(query)
-    print(params)
+    query = _insert_template(safe_table_name, safe_columns, 1)
+    rows = zip(*(_column_values(values) for values in columns.values()))
+
+    return query, rows
+
+
+def benchmark(num_rows: int) -> None:
+    """Compare rows/s of executemany against chunked multi-row INSERTs in SQLite."""
+    def make_rows():
+        return ((i, f"user{i}", f"user{i}@example.com") for i in range(num_rows))
+
+    def fresh_connection():
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE users (id INTEGER, name TEXT, email TEXT);")
+        return conn
+
+    conn = fresh_connection()
+    started_at = time.perf_counter()
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, name, email) VALUES (?, ?, ?);", make_rows()
+        )
+    executemany_secs = time.perf_counter() - started_at
+    conn.close()
+
+    conn = fresh_connection()
+    max_params = sqlite_max_params(conn)
+    started_at = time.perf_counter()
+    with conn:
+        for query, params in iter_insert_chunks(
+            "users", ["id", "name", "email"], make_rows(), max_params
+        ):
+            conn.execute(query, params)
+    chunked_secs = time.perf_counter() - started_at
+    conn.close()
+
+    print(f"Inserted {num_rows:,} rows (max_params={max_params})")
+    print(f"  executemany:        {num_rows / executemany_secs:>12,.0f} rows/s")
+    print(f"  iter_insert_chunks: {num_rows / chunked_secs:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQL INSERT query generator demo")
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare chunked multi-row INSERTs with executemany on SQLite",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=200_000, help="Rows to insert in the benchmark"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows)
+    else:
+        insert_columns = ["first_name", "last_name", "email"]
+        sample_data = [
+            ["John", "Doe", "john.doe@example.com"],
+            ["Jane", "Doe", "jane.doe@example.com"],
+        ]
+
+        query, params = generate_insert_query("users", insert_columns, sample_data)
+        print(query)
+        print(params)
+
+        for query, params in iter_insert_chunks(
+            "users", insert_columns, iter(sample_data), max_params=3
+        ):
+            print(query, params)
+
+        query, rows = generate_columnar_insert_query(
+            "readings",
+            {"sensor_id": array("i", [1, 2, 3]), "value": array("d", [0.5, 1.5, 2.5])},
+        )
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE readings (sensor_id INTEGER, value REAL);")
+        conn.executemany(query, rows)
+        print(query)
+        print(conn.execute("SELECT sensor_id, value FROM readings;").fetchall())
+        conn.close()
@@ -7,22 +7,21 @@ Goal: Programmatically generate parameterized SQL SELECT statements with column
 Use Case: Useful for query builders, reporting tools, or data export utilities.
 
 Note: This implementation returns a SQL template plus parameters, which is the
-safe pattern supported by Python DB-API drivers.
+safe pattern supported by Python DB-API drivers. generate_keyset_select_query
+adds keyset pagination (WHERE (k1, k2) > (?, ?) ORDER BY k1, k2 LIMIT ?), which
+costs the same for every page, unlike OFFSET paging that rescans every skipped
+row. iter_keyset_pages walks a whole table that way in constant memory.
 
 Usage:
     python select.py
+    python select.py --benchmark
 """
-from typing import List, Tuple
-import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+import argparse
+import sqlite3
+import time
 
-IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
-
-
-def validate_identifier(identifier: str, kind: str) -> str:
-    """Allow only simple SQL identifiers in this educational example."""
-    if not IDENTIFIER_RE.fullmatch(identifier):
-        raise ValueError(f"Invalid {kind}: {identifier!r}")
-    return identifier
+from schema import validate_identifier
 
 
 def generate_select_query(
@@ -64,12 +63,192 @@ def generate_select_query(
 
     return query + ";", params
 
-if __name__ == "__main__":
-    select_columns = ["name", "email"]
-    select_conditions = [
-        ("age", "20")
+
+def _keyset_template(
+    table_name: str,
+    columns: List[str],
+    key_columns: Sequence[str],
+    conditions: Sequence[Tuple[str, object]],
+    first_page: bool,
+) -> str:
+    """Build a keyset page template; the first page has no key predicate."""
+    if columns == ["*"]:
+        columns_clause = "*"
+    else:
+        columns_clause = ", ".join(
+            validate_identifier(column, "column name") for column in columns
+        )
+    safe_keys = [validate_identifier(column, "column name") for column in key_columns]
+
+    predicates = [
+        f"{validate_identifier(column, 'column name')} = ?" for column, _ in conditions
     ]
+    if not first_page:
+        if len(safe_keys) == 1:
+            predicates.append(f"{safe_keys[0]} > ?")
+        else:
+            key_list = ", ".join(safe_keys)
+            placeholders = ", ".join("?" for _ in safe_keys)
+            predicates.append(f"({key_list}) > ({placeholders})")
+
+    query = f"SELECT {columns_clause} FROM {validate_identifier(table_name, 'table name')}"
+    if predicates:
+        query += " WHERE " + " AND ".join(predicates)
+    return query + f" ORDER BY {', '.join(safe_keys)} LIMIT ?;"
+
+
+def generate_keyset_select_query(
+    table_name: str,
+    columns: List[str],
+    key_columns: Sequence[str],
+    conditions: Sequence[Tuple[str, object]] = (),
+    after: Optional[Sequence[object]] = None,
+    limit: int = 100,
+) -> Tuple[str, Tuple[object, ...]]:
+    """
+    Generate a keyset-paginated SQL SELECT query.
+
+    Args:
+    table_name (str): The name of the table from which to select records.
+    columns (List[str]): A list of columns to be selected.
+    key_columns (Sequence[str]): Unique, indexed ordering columns, e.g. the primary key.
+    conditions (Sequence[Tuple[str, object]]): Optional (column, value) equality filters.
+    after (Optional[Sequence[object]]): Key values of the last row of the previous
+                            page, or None for the first page.
+    limit (int): Maximum number of rows per page.
 
-    query, params = generate_select_query("students", select_columns, select_conditions)
-    print(query)
-    print(params)
+    Returns:
+    Tuple[str, Tuple[object, ...]]: A SQL template string and parameters tuple.
+
+    Example:
+    >>> generate_keyset_select_query(
+            "events", ["id", "day", "name"], ["day", "id"], after=("2024-01-01", 42), limit=50
+        )
+    (
+        "SELECT id, day, name FROM events WHERE (day, id) > (?, ?) ORDER BY day, id LIMIT ?;",
+        ("2024-01-01", 42, 50),
+    )
+    """
+    if not columns:
+        raise ValueError("SELECT requires at least one column")
+    if not key_columns:
+        raise ValueError("Keyset pagination requires at least one key column")
+    if after is not None and len(after) != len(key_columns):
+        raise ValueError("after must provide one value per key column")
+
+    query = _keyset_template(table_name, columns, key_columns, conditions, after is None)
+    params = tuple(value for _, value in conditions) + tuple(after or ()) + (limit,)
+
+    return query, params
+
+
+def iter_keyset_pages(
+    conn: sqlite3.Connection,
+    table_name: str,
+    columns: List[str],
+    key_columns: Sequence[str],
+    conditions: Sequence[Tuple[str, object]] = (),
+    page_size: int = 1000,
+) -> Iterator[List[Tuple[object, ...]]]:
+    """
+    Walk a whole table in key order, yielding one page of rows at a time.
+
+    Only the current page is held in memory, and both SQL templates (first
+    page and following pages) are built once. The key columns must be among
+    the selected columns so that each page can resume after its last row.
+    """
+    if not key_columns:
+        raise ValueError("Keyset pagination requires at least one key column")
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer")
+
+    first_query = _keyset_template(table_name, columns, key_columns, conditions, True)
+    next_query = _keyset_template(table_name, columns, key_columns, conditions, False)
+    condition_params = tuple(value for _, value in conditions)
+
+    cursor = conn.execute(first_query, condition_params + (page_size,))
+    selected = [description[0] for description in cursor.description]
+    missing = [column for column in key_columns if column not in selected]
+    if missing:
+        raise ValueError(f"Key columns must be selected: {', '.join(missing)}")
+    key_positions = [selected.index(column) for column in key_columns]
+
+    page = cursor.fetchall()
+    while page:
+        yield page
+        if len(page) < page_size:
+            return
+        last_row = page[-1]
+        after = tuple(last_row[position] for position in key_positions)
+        page = conn.execute(
+            next_query, condition_params + after + (page_size,)
+        ).fetchall()
+
+
+def benchmark(num_rows: int, page_size: int) -> None:
+    """Compare per-page latency of OFFSET paging and keyset paging on SQLite."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT);")
+    conn.executemany(
+        "INSERT INTO events (id, name) VALUES (?, ?);",
+        ((i, f"event{i}") for i in range(num_rows)),
+    )
+    conn.commit()
+
+    print(f"Paging through {num_rows:,} rows, {page_size} rows per page")
+    checkpoints = {num_rows // 10, num_rows // 2, num_rows - page_size}
+
+    offset_query = "SELECT id, name FROM events ORDER BY id LIMIT ? OFFSET ?;"
+    for offset in sorted(checkpoints):
+        started_at = time.perf_counter()
+        conn.execute(offset_query, (page_size, offset)).fetchall()
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        print(f"  OFFSET {offset:>10,}: {elapsed_ms:8.3f} ms/page")
+
+    for after in sorted(checkpoints):
+        started_at = time.perf_counter()
+        conn.execute(*generate_keyset_select_query(
+            "events", ["id", "name"], ["id"], after=(after - 1,), limit=page_size
+        )).fetchall()
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        print(f"  keyset {after:>10,}: {elapsed_ms:8.3f} ms/page")
+
+    started_at = time.perf_counter()
+    pages = iter_keyset_pages(conn, "events", ["id", "name"], ["id"], page_size=page_size)
+    total = sum(len(page) for page in pages)
+    elapsed = time.perf_counter() - started_at
+    print(f"  iter_keyset_pages: {total:,} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s)")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQL SELECT query generator demo")
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare OFFSET paging with keyset paging on SQLite",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="Rows in the benchmark table"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=1_000, help="Rows per page in the benchmark"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows, args.page_size)
+    else:
+        select_columns = ["name", "email"]
+        select_conditions = [
+            ("age", "20")
+        ]
+
+        query, params = generate_select_query("students", select_columns, select_conditions)
+        print(query)
+        print(params)
+
+        query, params = generate_keyset_select_query(
+            "events", ["id", "day", "name"], ["day", "id"], after=("2024-01-01", 42), limit=50
+        )
+        print(query)
+        print(params)
@@ -0,0 +1,173 @@
+"""
+SQL Template Cache
+
+Goal: Memoize the SQL templates produced by the query generators so that repeated
+      calls with the same query shape only rebuild the parameters tuple.
+
+Use Case: Useful for hot paths that issue millions of statements per hour with a
+          handful of distinct shapes, e.g. API backends or ingestion workers.
+
+Note: A template depends only on its shape (table, columns, condition columns and
+row count), never on the parameter values. The first call for a shape runs the
+regular generator, including identifier validation; every later call is a
+dictionary lookup plus a tuple build. The cache is a bounded LRU with hit and
+miss counters, similar to functools.lru_cache. Templates can be stored in a
+driver's placeholder style (see dialects.py), so the rewrite also happens only
+once per shape.
+
+Usage:
+    python template_cache.py
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, NamedTuple, Sequence, Tuple
+import timeit
+
+from delete import generate_delete_query
+from dialects import render_placeholders
+from insert_query import generate_insert_query
+from select import generate_select_query
+from update_query import generate_update_query
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class TemplateCache:
+    """
+    Bounded LRU cache of SQL templates keyed on query shape.
+
+    Args:
+    maxsize (int): Maximum number of templates kept before the least recently
+                   used one is evicted.
+    paramstyle (str): Placeholder style of the cached templates: "qmark",
+                      "format" or "numeric". Parameters stay positional.
+
+    Example:
+    >>> cache = TemplateCache(maxsize=64)
+    >>> cache.select("students", ["name", "email"], [("age", "20")])
+    ("SELECT name, email FROM students WHERE age = ?;", ("20",))
+    >>> cache.select("students", ["name", "email"], [("age", "21")])
+    ("SELECT name, email FROM students WHERE age = ?;", ("21",))
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=64, currsize=1)
+    """
+
+    def __init__(self, maxsize: int = 128, paramstyle: str = "qmark"):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        if paramstyle not in ("qmark", "format", "numeric"):
+            raise ValueError(f"Unsupported paramstyle: {paramstyle!r}")
+        self.maxsize = maxsize
+        self.paramstyle = paramstyle
+        self.hits = 0
+        self.misses = 0
+        self._templates: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def _template(self, key: Hashable, build: Callable[[], str]) -> str:
+        """Return the cached template for key, building it on a miss."""
+        templates = self._templates
+        try:
+            query = templates[key]
+        except KeyError:
+            self.misses += 1
+            query = render_placeholders(build(), self.paramstyle)
+            templates[key] = query
+            if len(templates) > self.maxsize:
+                templates.popitem(last=False)
+            return query
+
+        self.hits += 1
+        templates.move_to_end(key)
+        return query
+
+    def select(
+        self, table_name: str, columns: List[str], conditions: List[Tuple[str, object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        """Cached equivalent of generate_select_query."""
+        condition_columns = tuple(column for column, _ in conditions)
+        key = ("select", table_name, tuple(columns), condition_columns, 1)
+        query = self._template(
+            key, lambda: generate_select_query(table_name, list(columns), conditions)[0]
+        )
+        return query, tuple(value for _, value in conditions)
+
+    def update(
+        self, table_name: str, data: Dict[str, object], conditions: List[Tuple[str, object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        """Cached equivalent of generate_update_query."""
+        condition_columns = tuple(column for column, _ in conditions)
+        key = ("update", table_name, tuple(data), condition_columns, 1)
+        query = self._template(
+            key, lambda: generate_update_query(table_name, data, conditions)[0]
+        )
+        return query, tuple(data.values()) + tuple(value for _, value in conditions)
+
+    def delete(
+        self, table_name: str, conditions: List[Tuple[str, object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        """Cached equivalent of generate_delete_query."""
+        condition_columns = tuple(column for column, _ in conditions)
+        key = ("delete", table_name, (), condition_columns, 1)
+        query = self._template(
+            key, lambda: generate_delete_query(table_name, conditions)[0]
+        )
+        return query, tuple(value for _, value in conditions)
+
+    def insert(
+        self, table_name: str, columns: Sequence[str], data: Sequence[Sequence[object]]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        """Cached equivalent of generate_insert_query."""
+        key = ("insert", table_name, tuple(columns), (), len(data))
+        query = self._template(
+            key, lambda: generate_insert_query(table_name, columns, data)[0]
+        )
+        # The row-length check is part of the input contract, not of the shape,
+        # so it still runs on a hit.
+        row_length = len(columns)
+        for row in data:
+            if len(row) != row_length:
+                raise ValueError("Every INSERT row must match the number of columns")
+        return query, tuple(value for row in data for value in row)
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss statistics in the same shape as functools.lru_cache."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._templates))
+
+    def clear(self) -> None:
+        """Drop all cached templates and reset the counters."""
+        self._templates.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+if __name__ == "__main__":
+    cache = TemplateCache(maxsize=32)
+
+    for age in ("20", "21", "22"):
+        query, params = cache.select("students", ["name", "email"], [("age", age)])
+        print(query, params)
+
+    query, params = cache.update(
+        "users", {"email": "john.updated@example.com"}, [("first_name", "John")]
+    )
+    print(query, params)
+    print(cache.info())
+
+    postgres_cache = TemplateCache(paramstyle="format")
+    print(*postgres_cache.delete("students", [("name", "John Doe"), ("age", "20")]))
+
+    number = 100_000
+    uncached = timeit.timeit(
+        lambda: generate_select_query("students", ["name", "email"], [("age", "20")]),
+        number=number,
+    )
+    cached = timeit.timeit(
+        lambda: cache.select("students", ["name", "email"], [("age", "20")]),
+        number=number,
+    )
+    print(f"generate_select_query: {uncached / number * 1e6:.2f} us/call")
+    print(f"TemplateCache.select:  {cached / number * 1e6:.2f} us/call")
@@ -7,22 +7,22 @@ Goal: Programmatically generate parameterized SQL UPDATE statements with SET
 Use Case: Useful for data transformation scripts, API update endpoints, or admin tools.
 
 Note: This implementation returns a SQL template plus parameters, which is the
-safe pattern supported by Python DB-API drivers.
+safe pattern supported by Python DB-API drivers. generate_batch_update_query
+updates many rows by key in one set-based statement, using
+UPDATE ... FROM (VALUES ...) where the dialect supports it and
+CASE key WHEN ... THEN ... elsewhere.
 
 Usage:
     python update_query.py
+    python update_query.py --benchmark
 """
-from typing import Dict, List, Tuple
-import re
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import sqlite3
+import time
 
-IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
-
-
-def validate_identifier(identifier: str, kind: str) -> str:
-    """Allow only simple SQL identifiers in this educational example."""
-    if not IDENTIFIER_RE.fullmatch(identifier):
-        raise ValueError(f"Invalid {kind}: {identifier!r}")
-    return identifier
+from insert_query import SQLITE_MAX_VARIABLE_NUMBER
+from schema import validate_identifier
 
 
 def generate_update_query(
@@ -71,16 +71,238 @@ def generate_update_query(
 
     return query, params
 
+
+# UPDATE ... FROM arrived in SQLite 3.33.0.
+SQLITE_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+
+def batch_update_style(dialect: str) -> str:
+    """Return "values" for dialects with UPDATE ... FROM, otherwise "case"."""
+    if dialect == "postgres" or (dialect == "sqlite" and SQLITE_HAS_UPDATE_FROM):
+        return "values"
+    return "case"
+
+
+def _batch_update_template(
+    table_name: str, key_column: str, set_columns: Sequence[str], row_count: int, style: str
+) -> str:
+    """Build a batched UPDATE template from already validated identifiers."""
+    if style == "values":
+        row_placeholder = "(" + ", ".join("?" for _ in range(len(set_columns) + 1)) + ")"
+        values_clause = ", ".join(row_placeholder for _ in range(row_count))
+        cte_columns = ", ".join([key_column, *set_columns])
+        set_clause = ", ".join(f"{column} = new_values.{column}" for column in set_columns)
+        return (
+            f"WITH new_values ({cte_columns}) AS (VALUES {values_clause}) "
+            f"UPDATE {table_name} SET {set_clause} FROM new_values "
+            f"WHERE {table_name}.{key_column} = new_values.{key_column};"
+        )
+
+    when_clause = " ".join("WHEN ? THEN ?" for _ in range(row_count))
+    set_clause = ", ".join(
+        f"{column} = CASE {key_column} {when_clause} END" for column in set_columns
+    )
+    in_clause = ", ".join("?" for _ in range(row_count))
+    return f"UPDATE {table_name} SET {set_clause} WHERE {key_column} IN ({in_clause});"
+
+
+def _batch_update_params(
+    rows: Sequence[Tuple[object, Sequence[object]]], column_count: int, style: str
+) -> Tuple[object, ...]:
+    """Flatten (key, values) pairs in the order the template expects."""
+    if style == "values":
+        return tuple(item for key, values in rows for item in (key, *values))
+    params: List[object] = []
+    for index in range(column_count):
+        for key, values in rows:
+            params.append(key)
+            params.append(values[index])
+    params.extend(key for key, _ in rows)
+    return tuple(params)
+
+
+def generate_batch_update_query(
+    table_name: str,
+    key_column: str,
+    set_columns: Sequence[str],
+    rows: Sequence[Tuple[object, Sequence[object]]],
+    dialect: str = "sqlite",
+) -> Tuple[str, Tuple[object, ...]]:
+    """
+    Generate one parameterized UPDATE statement that modifies many rows by key.
+
+    Args:
+    table_name (str): The name of the table to update.
+    key_column (str): The column identifying each row, usually the primary key.
+    set_columns (Sequence[str]): The columns to modify.
+    rows (Sequence[Tuple[object, Sequence[object]]]): (key, new_values) pairs, where
+                            new_values lines up with set_columns. Keys must be unique.
+    dialect (str): "sqlite", "postgres", "mysql", or any other name for the portable
+                   CASE form.
+
+    Returns:
+    Tuple[str, Tuple[object, ...]]: A SQL template string and parameters tuple.
+
+    Example:
+    >>> generate_batch_update_query(
+            "users", "id", ["email"], [(1, ["a@example.com"]), (2, ["b@example.com"])],
+            dialect="mysql",
+        )
+    (
+        "UPDATE users SET email = CASE id WHEN ? THEN ? WHEN ? THEN ? END WHERE id IN (?, ?);",
+        (1, "a@example.com", 2, "b@example.com", 1, 2),
+    )
+    """
+    if not set_columns:
+        raise ValueError("UPDATE requires at least one column to modify")
+    if not rows:
+        raise ValueError("Batched UPDATE requires at least one row")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_key_column = validate_identifier(key_column, "column name")
+    safe_columns = [validate_identifier(column, "column name") for column in set_columns]
+
+    for _, values in rows:
+        if len(values) != len(safe_columns):
+            raise ValueError("Every UPDATE row must match the number of SET columns")
+
+    style = batch_update_style(dialect)
+    query = _batch_update_template(
+        safe_table_name, safe_key_column, safe_columns, len(rows), style
+    )
+
+    return query, _batch_update_params(rows, len(safe_columns), style)
+
+
+def iter_batch_update_chunks(
+    table_name: str,
+    key_column: str,
+    set_columns: Sequence[str],
+    rows: Iterable[Tuple[object, Sequence[object]]],
+    dialect: str = "sqlite",
+    max_params: int = SQLITE_MAX_VARIABLE_NUMBER,
+) -> Iterator[Tuple[str, Tuple[object, ...]]]:
+    """
+    Stream batched UPDATE statements that each stay under max_params parameters.
+
+    Every full chunk reuses the same SQL template; only the final, partial
+    chunk gets a shorter one.
+    """
+    if not set_columns:
+        raise ValueError("UPDATE requires at least one column to modify")
+
+    safe_table_name = validate_identifier(table_name, "table name")
+    safe_key_column = validate_identifier(key_column, "column name")
+    safe_columns = [validate_identifier(column, "column name") for column in set_columns]
+
+    style = batch_update_style(dialect)
+    column_count = len(safe_columns)
+    params_per_row = column_count + 1 if style == "values" else 2 * column_count + 1
+    rows_per_chunk = max_params // params_per_row
+    if rows_per_chunk < 1:
+        raise ValueError(
+            f"A single row needs {params_per_row} parameters, above the limit of {max_params}"
+        )
+
+    full_query: Optional[str] = None
+    chunk: List[Tuple[object, Sequence[object]]] = []
+    for key, values in rows:
+        if len(values) != column_count:
+            raise ValueError("Every UPDATE row must match the number of SET columns")
+        chunk.append((key, values))
+        if len(chunk) == rows_per_chunk:
+            if full_query is None:
+                full_query = _batch_update_template(
+                    safe_table_name, safe_key_column, safe_columns, rows_per_chunk, style
+                )
+            yield full_query, _batch_update_params(chunk, column_count, style)
+            chunk = []
+
+    if chunk:
+        query = _batch_update_template(
+            safe_table_name, safe_key_column, safe_columns, len(chunk), style
+        )
+        yield query, _batch_update_params(chunk, column_count, style)
+
+
+def benchmark(num_rows: int) -> None:
+    """Compare a per-row UPDATE loop with batched UPDATEs on SQLite."""
+    def fresh_connection():
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT, score INTEGER);")
+        conn.executemany(
+            "INSERT INTO users (id, email, score) VALUES (?, ?, 0);",
+            ((i, f"user{i}@example.com") for i in range(num_rows)),
+        )
+        conn.commit()
+        return conn
+
+    def updates():
+        return ((i, (f"new{i}@example.com", i)) for i in range(num_rows))
+
+    conn = fresh_connection()
+    started_at = time.perf_counter()
+    with conn:
+        for key, (email, score) in updates():
+            conn.execute(*generate_update_query(
+                "users", {"email": email, "score": score}, [("id", key)]
+            ))
+    per_row_secs = time.perf_counter() - started_at
+    conn.close()
+
+    print(f"Updating {num_rows:,} rows")
+    print(f"  per-row loop:           {num_rows / per_row_secs:>12,.0f} rows/s")
+
+    for dialect in ("sqlite", "mysql"):
+        conn = fresh_connection()
+        started_at = time.perf_counter()
+        with conn:
+            for query, params in iter_batch_update_chunks(
+                "users", "id", ["email", "score"], updates(), dialect=dialect
+            ):
+                conn.execute(query, params)
+        batched_secs = time.perf_counter() - started_at
+        email = conn.execute("SELECT email FROM users WHERE id = 1;").fetchone()[0]
+        assert email == "new1@example.com"
+        conn.close()
+        label = f"batched ({batch_update_style(dialect)}):"
+        print(f"  {label:<23} {num_rows / batched_secs:>12,.0f} rows/s")
+
+
 if __name__ == "__main__":
-    update_data = {
-        "email": "john.updated@example.com",
-        "last_name": "UpdatedDoe"
-    }
-    update_conditions = [
-        ("first_name", "John"),
-        ("last_name", "Doe")
-    ]
-
-    query, params = generate_update_query("users", update_data, update_conditions)
-    print(query)
-    print(params)
+    parser = argparse.ArgumentParser(description="SQL UPDATE query generator demo")
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare batched UPDATEs with a per-row loop on SQLite",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=50_000, help="Rows to update in the benchmark"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows)
+    else:
+        update_data = {
+            "email": "john.updated@example.com",
+            "last_name": "UpdatedDoe"
+        }
+        update_conditions = [
+            ("first_name", "John"),
+            ("last_name", "Doe")
+        ]
+
+        query, params = generate_update_query("users", update_data, update_conditions)
+        print(query)
+        print(params)
+
+        batch_rows = [
+            (1, ["a.updated@example.com", "A"]),
+            (2, ["b.updated@example.com", "B"]),
+        ]
+        for dialect in ("postgres", "mysql"):
+            query, params = generate_batch_update_query(
+                "users", "id", ["email", "last_name"], batch_rows, dialect=dialect
+            )
+            print(query)
+            print(params)
@@ -0,0 +1,232 @@
+"""
+SQL UPSERT Query Generator
+
+Goal: Programmatically generate parameterized multi-row UPSERT statements, so that
+      "insert or update" is a single statement instead of a SELECT followed by an
+      INSERT or UPDATE.
+
+Use Case: Useful for sync jobs, caches of external data, or idempotent ingestion
+          where rows may or may not exist yet.
+
+Note: SQLite (3.24+) and PostgreSQL use INSERT ... ON CONFLICT (...) DO UPDATE SET
+col = excluded.col, MySQL uses INSERT ... ON DUPLICATE KEY UPDATE col = VALUES(col).
+The conflict is resolved by the database under its own locks, so there is no
+race between checking for a row and writing it. Chunking follows the same rules
+as iter_insert_chunks in insert_query.py. A single statement must not contain
+the same key twice: PostgreSQL rejects it and the other engines apply both.
+
+Usage:
+    python upsert_query.py
+    python upsert_query.py --benchmark
+"""
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from insert_query import SQLITE_MAX_VARIABLE_NUMBER, generate_insert_query, iter_insert_chunks
+from schema import validate_identifier
+from select import generate_select_query
+from update_query import generate_update_query
+
+
+def _conflict_clause(
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]],
+    dialect: str,
+) -> str:
+    """Build the ON CONFLICT / ON DUPLICATE KEY clause from validated identifiers."""
+    if update_columns is None:
+        update_columns = [column for column in columns if column not in conflict_columns]
+
+    if dialect == "mysql":
+        # MySQL resolves conflicts on any unique key, so conflict_columns only
+        # serve as a no-op target when there is nothing to update.
+        assignments = [f"{column} = VALUES({column})" for column in update_columns]
+        if not assignments:
+            assignments = [f"{conflict_columns[0]} = {conflict_columns[0]}"]
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(assignments)
+
+    if dialect not in ("sqlite", "postgres"):
+        raise ValueError(f"Unsupported upsert dialect: {dialect!r}")
+    target = ", ".join(conflict_columns)
+    if not update_columns:
+        return f"ON CONFLICT ({target}) DO NOTHING"
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in update_columns)
+    return f"ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+
+def _validated(
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]],
+) -> Tuple[list, list, Optional[list]]:
+    """Validate all column lists and check that they refer to inserted columns."""
+    if not conflict_columns:
+        raise ValueError("UPSERT requires at least one conflict column")
+
+    safe_columns = [validate_identifier(column, "column name") for column in columns]
+    safe_conflict = [validate_identifier(column, "column name") for column in conflict_columns]
+    safe_update = None
+    if update_columns is not None:
+        safe_update = [validate_identifier(column, "column name") for column in update_columns]
+
+    for column in safe_conflict + (safe_update or []):
+        if column not in safe_columns:
+            raise ValueError(f"UPSERT column {column!r} is not one of the inserted columns")
+    return safe_columns, safe_conflict, safe_update
+
+
+def generate_upsert_query(
+    table_name: str,
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    data: Sequence[Sequence[object]],
+    dialect: str = "sqlite",
+    update_columns: Optional[Sequence[str]] = None,
+) -> Tuple[str, Tuple[object, ...]]:
+    """
+    Generate a parameterized multi-row UPSERT query.
+
+    Args:
+    table_name (str): The name of the table to write to.
+    columns (Sequence[str]): Column names to insert into.
+    conflict_columns (Sequence[str]): The unique key that decides whether a row exists.
+    data (Sequence[Sequence[object]]): A list of rows, each matching columns.
+    dialect (str): "sqlite", "postgres" or "mysql".
+    update_columns (Optional[Sequence[str]]): Columns to overwrite on conflict. Defaults
+                            to every non-conflict column; an empty list keeps existing rows.
+
+    Returns:
+    Tuple[str, Tuple[object, ...]]: A SQL template string and parameters tuple.
+
+    Example:
+    >>> generate_upsert_query("users", ["id", "email"], ["id"], [[1, "a@example.com"]])
+    (
+        "INSERT INTO users (id, email) VALUES (?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET email = excluded.email;",
+        (1, "a@example.com"),
+    )
+    """
+    safe_columns, safe_conflict, safe_update = _validated(
+        columns, conflict_columns, update_columns
+    )
+    query, params = generate_insert_query(table_name, safe_columns, data)
+    clause = _conflict_clause(safe_columns, safe_conflict, safe_update, dialect)
+
+    return f"{query[:-1]} {clause};", params
+
+
+def iter_upsert_chunks(
+    table_name: str,
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    dialect: str = "sqlite",
+    update_columns: Optional[Sequence[str]] = None,
+    max_params: int = SQLITE_MAX_VARIABLE_NUMBER,
+) -> Iterator[Tuple[str, Tuple[object, ...]]]:
+    """
+    Stream multi-row UPSERT statements that each stay under max_params parameters.
+
+    Rows are consumed lazily, and every full chunk shares one SQL template string.
+    """
+    safe_columns, safe_conflict, safe_update = _validated(
+        columns, conflict_columns, update_columns
+    )
+    clause = _conflict_clause(safe_columns, safe_conflict, safe_update, dialect)
+
+    insert_query = upsert_query = None
+    for query, params in iter_insert_chunks(table_name, safe_columns, rows, max_params):
+        if query is not insert_query:
+            insert_query = query
+            upsert_query = f"{query[:-1]} {clause};"
+        yield upsert_query, params
+
+
+def benchmark(num_rows: int) -> None:
+    """Compare batched UPSERTs with select-then-write on an on-disk SQLite database."""
+    columns = ["id", "email", "visits"]
+
+    def rows():
+        # Every other id already exists in the table.
+        return ((i, f"user{i}@example.com", i) for i in range(num_rows))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "upsert_benchmark.db")
+
+        def fresh_connection():
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            conn = sqlite3.connect(db_path)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT, visits INTEGER);")
+            conn.executemany(
+                "INSERT INTO users (id, email, visits) VALUES (?, ?, 0);",
+                ((i, f"old{i}@example.com") for i in range(0, num_rows, 2)),
+            )
+            conn.commit()
+            return conn
+
+        print(f"Upserting {num_rows:,} rows, half of them already present")
+
+        conn = fresh_connection()
+        started_at = time.perf_counter()
+        with conn:
+            for user_id, email, visits in rows():
+                exists = conn.execute(
+                    *generate_select_query("users", ["id"], [("id", user_id)])
+                ).fetchone()
+                if exists:
+                    conn.execute(*generate_update_query(
+                        "users", {"email": email, "visits": visits}, [("id", user_id)]
+                    ))
+                else:
+                    conn.execute(*generate_insert_query(
+                        "users", columns, [[user_id, email, visits]]
+                    ))
+        elapsed = time.perf_counter() - started_at
+        conn.close()
+        print(f"  select-then-write: {num_rows / elapsed:>12,.0f} rows/s")
+
+        conn = fresh_connection()
+        started_at = time.perf_counter()
+        with conn:
+            for query, params in iter_upsert_chunks("users", columns, ["id"], rows()):
+                conn.execute(query, params)
+        elapsed = time.perf_counter() - started_at
+        count, = conn.execute("SELECT count(*) FROM users WHERE email LIKE 'user%';").fetchone()
+        assert count == num_rows
+        conn.close()
+        print(f"  batched upsert:    {num_rows / elapsed:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQL UPSERT query generator demo")
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="Compare batched UPSERTs with select-then-write on SQLite",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=100_000, help="Rows to upsert in the benchmark"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows)
+    else:
+        upsert_columns = ["id", "email", "last_name"]
+        sample_data = [
+            [1, "john.doe@example.com", "Doe"],
+            [2, "jane.doe@example.com", "Doe"],
+        ]
+
+        for dialect in ("sqlite", "mysql"):
+            query, params = generate_upsert_query(
+                "users", upsert_columns, ["id"], sample_data, dialect=dialect
+            )
+            print(query)
+            print(params)
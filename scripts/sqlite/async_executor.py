@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+asyncio Execution Layer for SQLite
+
+Goal: Run generated (sql, params) statements from asyncio code without blocking
+      the event loop, using a bounded pool of reader threads and one dedicated
+      writer thread.
+
+Concept:
+- sqlite3 calls block, so running them directly in a coroutine stalls every
+  other request on the event loop.
+- Reads go to a bounded thread pool; each thread owns one connection. SQLite
+  releases the GIL while it steps through a query, so reads really overlap.
+- All writes go to a single writer thread with its own connection, mirroring
+  SQLite's one-writer rule instead of fighting it with busy timeouts.
+- execute_many pipelines a list of statements into one writer job and one
+  transaction, e.g. the chunks produced by iter_insert_chunks or
+  iter_upsert_chunks in generating_query_strings/.
+- WAL mode lets the readers keep going while the writer commits.
+
+Usage:
+    python sqlite/async_executor.py
+    python sqlite/async_executor.py --benchmark
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Sequence, Tuple
+import argparse
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+DB = 'async_demo.db'
+
+Statement = Tuple[str, Sequence[object]]
+
+
+class AsyncSQLiteExecutor:
+    """
+    Awaitable front end for one SQLite database.
+
+    Example:
+        async with AsyncSQLiteExecutor("app.db", readers=4) as db:
+            await db.execute("INSERT INTO users (name) VALUES (?);", ("Ann",))
+            rows = await db.fetchall("SELECT name FROM users WHERE id = ?;", (1,))
+    """
+
+    def __init__(self, database, readers=4, timeout=30.0):
+        self.database = database
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="sqlite-reader",
+            initializer=self._open_connection,
+        )
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-writer",
+            initializer=self._open_connection, initargs=(True,),
+        )
+
+    def _open_connection(self, writer=False):
+        """Open the calling thread's connection (runs once per pool thread)."""
+        conn = sqlite3.connect(
+            self.database, timeout=self.timeout, isolation_level=None,
+            check_same_thread=False,
+        )
+        if writer:
+            conn.execute("PRAGMA journal_mode = WAL;")
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+
+    # --- functions that run on the pool threads ---------------------------
+
+    def _fetchall(self, sql, params):
+        return self._local.conn.execute(sql, params).fetchall()
+
+    def _execute(self, sql, params):
+        return self._local.conn.execute(sql, params).rowcount
+
+    def _execute_many(self, statements):
+        conn = self._local.conn
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            rowcounts = [conn.execute(sql, params).rowcount for sql, params in statements]
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+        return rowcounts
+
+    # --- awaitable API ----------------------------------------------------
+
+    async def fetchall(self, sql: str, params: Sequence[object] = ()) -> list:
+        """Run a read-only statement on a reader thread and return all rows."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._fetchall, sql, params)
+
+    async def execute(self, sql: str, params: Sequence[object] = ()) -> int:
+        """Run one write statement in its own transaction; return its rowcount."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._execute, sql, params)
+
+    async def execute_many(self, statements: Iterable[Statement]) -> List[int]:
+        """Run several write statements back to back in one transaction."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._execute_many, list(statements))
+
+    async def close(self):
+        """Wait for queued work, then close every connection."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self):
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def setup_database(num_rows):
+    """Create the demo table with num_rows rows."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(DB + suffix):
+            os.remove(DB + suffix)
+    conn = sqlite3.connect(DB)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("""
+        CREATE TABLE orders (
+            id          INTEGER PRIMARY KEY,
+            customer_id INTEGER NOT NULL,
+            amount      REAL NOT NULL
+        );
+    """)
+    conn.executemany(
+        "INSERT INTO orders (customer_id, amount) VALUES (?, ?);",
+        ((i % 1000, (i * 7) % 100 + 0.5) for i in range(num_rows)),
+    )
+    conn.commit()
+    conn.close()
+    print(f"[Setup] Created {DB} with {num_rows:,} orders.", flush=True)
+
+
+# A read that scans a few thousand rows, typical of a small report endpoint.
+REPORT_SQL = "SELECT count(*), sum(amount) FROM orders WHERE id BETWEEN ? AND ?;"
+
+
+def report_params(request_id, num_rows):
+    start = (request_id * 7919) % max(1, num_rows - 5000)
+    return (start, start + 5000)
+
+
+async def demo():
+    setup_database(10_000)
+    async with AsyncSQLiteExecutor(DB, readers=4) as db:
+        statements = [
+            ("INSERT INTO orders (customer_id, amount) VALUES (?, ?);", (42, 10.0)),
+            ("UPDATE orders SET amount = amount + ? WHERE customer_id = ?;", (1.0, 42)),
+        ]
+        rowcounts = await db.execute_many(statements)
+        print(f"[Writer] Pipelined {len(statements)} statements, rowcounts={rowcounts}")
+
+        results = await asyncio.gather(*(
+            db.fetchall("SELECT count(*), sum(amount) FROM orders WHERE customer_id = ?;", (c,))
+            for c in (1, 2, 42)
+        ))
+        for customer_id, rows in zip((1, 2, 42), results):
+            print(f"[Reader] customer {customer_id}: {rows[0]}")
+
+
+async def benchmark(num_rows, requests, readers):
+    setup_database(num_rows)
+    # Reader threads only overlap inside SQLite, so the gain is bounded by cores.
+    print(f"[Setup] {os.cpu_count()} CPU cores available.", flush=True)
+
+    conn = sqlite3.connect(DB)
+    started_at = time.perf_counter()
+    for request_id in range(requests):
+        conn.execute(REPORT_SQL, report_params(request_id, num_rows)).fetchall()
+    blocking_secs = time.perf_counter() - started_at
+    conn.close()
+    print(f"[Blocking] {requests / blocking_secs:10,.0f} requests/s (one connection)")
+
+    for pool_size in sorted({1, 2, 4, readers}):
+        async with AsyncSQLiteExecutor(DB, readers=pool_size) as db:
+            started_at = time.perf_counter()
+            await asyncio.gather(*(
+                db.fetchall(REPORT_SQL, report_params(request_id, num_rows))
+                for request_id in range(requests)
+            ))
+            async_secs = time.perf_counter() - started_at
+        print(f"[Async]    {requests / async_secs:10,.0f} requests/s ({pool_size} reader threads)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Demo: asyncio execution layer over sqlite3"
+    )
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Compare concurrent-request throughput with the blocking path'
+    )
+    parser.add_argument('--rows', type=int, default=500_000, help='Rows in the benchmark table')
+    parser.add_argument('--requests', type=int, default=2_000, help='Concurrent requests')
+    parser.add_argument('--readers', type=int, default=8, help='Largest reader pool size')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        asyncio.run(benchmark(args.rows, args.requests, args.readers))
+    else:
+        asyncio.run(demo())
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+SQLite Connection Pool: WAL Reader Fan-Out and a Single-Writer Queue
+
+Goal: Reuse a fixed set of read-only connections across threads and funnel
+      every write through one writer connection, instead of opening a fresh
+      sqlite3.connect for every read as concurrent_readers.py does.
+
+Concept:
+- In WAL mode readers never block the writer and the writer never blocks
+  readers, so N pre-opened reader connections can serve N threads at once.
+- Reader connections are opened with a `mode=ro` URI, so a bug cannot turn a
+  read path into a write that competes for the lock.
+- SQLite allows one writer at a time. A single writer thread owns the only
+  read-write connection and drains a queue of write jobs, so writers wait in
+  the queue instead of spinning on SQLITE_BUSY. Each job gets a Future.
+- A reader that has been idle longer than health_check_interval runs
+  `SELECT 1` before it is handed out, and a broken connection is replaced.
+- The pool records how long callers waited for a reader, which shows whether
+  the pool is too small.
+
+Usage:
+    python sqlite/connection_pool.py
+    python sqlite/connection_pool.py --benchmark --readers 8 --seconds 3
+"""
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from urllib.parse import quote
+import argparse
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+DB = 'pool_demo.db'
+
+
+class SQLitePool:
+    """
+    N read-only WAL connections plus one queued writer for a single database file.
+
+    Example:
+        with SQLitePool("app.db", readers=4) as pool:
+            pool.execute("INSERT INTO users (name) VALUES (?);", ("Ann",))
+            rows = pool.fetchall("SELECT name FROM users;")
+            print(pool.stats())
+    """
+
+    def __init__(self, database, readers=4, timeout=30.0, health_check_interval=30.0):
+        self.database = database
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=100_000)
+        self._counters = {"acquired": 0, "timeouts": 0, "replaced": 0, "writes": 0, "write_errors": 0}
+
+        # The writer connection is opened first: it creates the file and turns on WAL,
+        # which read-only connections cannot do.
+        self._writer_conn = sqlite3.connect(
+            database, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._writer_conn.execute("PRAGMA journal_mode = WAL;")
+        self._write_queue = queue.Queue()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="sqlite-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+        self._readers = queue.LifoQueue()
+        self.size = readers
+        for _ in range(readers):
+            self._readers.put((self._open_reader(), time.monotonic()))
+
+    def _open_reader(self):
+        uri = f"file:{quote(os.path.abspath(self.database))}?mode=ro"
+        return sqlite3.connect(uri, uri=True, timeout=self.timeout, check_same_thread=False)
+
+    # --- readers ----------------------------------------------------------
+
+    @contextmanager
+    def reader(self, timeout=None):
+        """Borrow a read-only connection; raises TimeoutError if none frees up in time."""
+        started_at = time.perf_counter()
+        try:
+            conn, last_used = self._readers.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self._counters["timeouts"] += 1
+            raise TimeoutError(f"No reader connection available within {timeout}s") from None
+        waited = time.perf_counter() - started_at
+        with self._lock:
+            self._counters["acquired"] += 1
+            self._waits.append(waited)
+
+        if conn is None or time.monotonic() - last_used > self.health_check_interval:
+            try:
+                conn = self._checked(conn)
+            except BaseException:
+                # Keep the slot, empty, so the next caller retries the reopen and
+                # close() does not wait forever for a connection that is gone.
+                self._readers.put((None, 0.0))
+                raise
+        try:
+            yield conn
+        finally:
+            self._readers.put((conn, time.monotonic()))
+
+    def _checked(self, conn):
+        """Return conn if it still answers, otherwise a fresh replacement (conn=None: empty slot)."""
+        if conn is not None:
+            try:
+                conn.execute("SELECT 1;").fetchone()
+                return conn
+            except sqlite3.Error:
+                conn.close()
+                with self._lock:
+                    self._counters["replaced"] += 1
+        return self._open_reader()
+
+    def fetchall(self, sql, params=(), timeout=None):
+        with self.reader(timeout) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    # --- writer -----------------------------------------------------------
+
+    def submit(self, job):
+        """
+        Queue job(conn) to run on the writer connection inside BEGIN IMMEDIATE ... COMMIT.
+
+        Returns a Future with the job's return value, or its exception after a ROLLBACK.
+        """
+        future = Future()
+        self._write_queue.put((future, job))
+        return future
+
+    def write(self, sql, params=()):
+        """Queue one write statement; the Future resolves to its rowcount."""
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def execute(self, sql, params=()):
+        """Run one write statement through the queue and wait for its rowcount."""
+        return self.write(sql, params).result()
+
+    def _writer_loop(self):
+        conn = self._writer_conn
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            future, job = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn.execute("BEGIN IMMEDIATE;")
+                result = job(conn)
+                conn.execute("COMMIT;")
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK;")
+                with self._lock:
+                    self._counters["write_errors"] += 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self._counters["writes"] += 1
+                future.set_result(result)
+
+    # --- health and statistics -------------------------------------------
+
+    def health_check(self):
+        """Check every idle reader and the writer now; return counts of healthy and replaced."""
+        checked = []
+        while True:
+            try:
+                conn, _ = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            checked.append(conn)
+        with self._lock:
+            replaced_before = self._counters["replaced"]
+        unavailable = 0
+        for conn in checked:
+            try:
+                self._readers.put((self._checked(conn), time.monotonic()))
+            except sqlite3.Error:
+                unavailable += 1
+                self._readers.put((None, 0.0))
+        writer_ok = self.submit(lambda conn: conn.execute("SELECT 1;").fetchone()[0] == 1).result()
+        with self._lock:
+            replaced = self._counters["replaced"] - replaced_before
+        return {
+            "readers_checked": len(checked),
+            "readers_replaced": replaced,
+            "readers_unavailable": unavailable,
+            "readers_busy": self.size - len(checked),
+            "writer_ok": writer_ok,
+            "write_queue": self._write_queue.qsize(),
+        }
+
+    def stats(self):
+        """Counters plus reader wait-time statistics in milliseconds."""
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = dict(self._counters)
+        if waits:
+            counters.update(
+                wait_mean_ms=sum(waits) / len(waits) * 1000,
+                wait_p99_ms=waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000,
+                wait_max_ms=waits[-1] * 1000,
+            )
+        counters["idle_readers"] = self._readers.qsize()
+        counters["write_queue"] = self._write_queue.qsize()
+        return counters
+
+    def reset_stats(self):
+        with self._lock:
+            self._waits.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def close(self):
+        """Finish queued writes, stop the writer thread and close all connections."""
+        self._write_queue.put(None)
+        self._writer_thread.join()
+        self._writer_conn.close()
+        for _ in range(self.size):
+            conn, _ = self._readers.get()
+            if conn is not None:
+                conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def setup_database(num_rows):
+    """Create the demo table with num_rows rows."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(DB + suffix):
+            os.remove(DB + suffix)
+    conn = sqlite3.connect(DB)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("""
+        CREATE TABLE accounts (
+            id      INTEGER PRIMARY KEY,
+            balance INTEGER NOT NULL
+        );
+    """)
+    conn.executemany(
+        "INSERT INTO accounts (id, balance) VALUES (?, 100);", ((i,) for i in range(1, num_rows + 1))
+    )
+    conn.commit()
+    conn.close()
+    print(f"[Setup] Created {DB} with {num_rows:,} accounts.", flush=True)
+
+
+def demo():
+    setup_database(1_000)
+    with SQLitePool(DB, readers=3) as pool:
+        futures = [
+            pool.write("UPDATE accounts SET balance = balance + ? WHERE id = ?;", (10, i))
+            for i in range(1, 6)
+        ]
+        print(f"[Writer] Queued 5 updates, rowcounts={[f.result() for f in futures]}")
+
+        try:
+            pool.execute("INSERT INTO accounts (id, balance) VALUES (1, 0);")
+        except sqlite3.IntegrityError as e:
+            print(f"[Writer] Failed write is rolled back and reported to its caller: {e}")
+
+        try:
+            with pool.reader() as conn:
+                conn.execute("DELETE FROM accounts;")
+        except sqlite3.OperationalError as e:
+            print(f"[Reader] Readers are read-only: {e}")
+
+        total, = pool.fetchall("SELECT sum(balance) FROM accounts;")[0]
+        print(f"[Reader] Total balance = {total:,}")
+        print(f"[Health] {pool.health_check()}")
+        stats = {name: round(value, 4) for name, value in pool.stats().items()}
+        print(f"[Stats]  {stats}")
+
+
+def benchmark(num_rows, max_readers, seconds):
+    setup_database(num_rows)
+    print(f"[Setup] {os.cpu_count()} CPU cores; a writer updates rows during every run.\n", flush=True)
+    query = "SELECT balance FROM accounts WHERE id BETWEEN ? AND ?;"
+
+    def run(threads, read):
+        stop = threading.Event()
+        counts = [0] * threads
+
+        def reader_thread(n):
+            rng = random.Random(n)
+            while not stop.is_set():
+                start = rng.randrange(1, num_rows - 100)
+                read(query, (start, start + 100))
+                counts[n] += 1
+
+        workers = [threading.Thread(target=reader_thread, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        return sum(counts) / seconds
+
+    def connect_per_query(sql, params):
+        conn = sqlite3.connect(DB)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    with SQLitePool(DB, readers=max_readers) as pool:
+        writing = threading.Event()
+        writing.set()
+
+        def background_writes():
+            rng = random.Random(0)
+            while writing.is_set():
+                pool.execute("UPDATE accounts SET balance = balance + 1 WHERE id = ?;",
+                             (rng.randrange(1, num_rows),))
+                time.sleep(0.001)
+
+        writer = threading.Thread(target=background_writes)
+        writer.start()
+
+        qps = run(max_readers, connect_per_query)
+        print(f"[connect per query] {max_readers:>2} threads: {qps:>10,.0f} reads/s")
+        # The last run has more threads than connections, so callers start to wait.
+        writes = 0
+        for threads in sorted({1, 2, 4, max_readers, 2 * max_readers}):
+            pool.reset_stats()
+            qps = run(threads, pool.fetchall)
+            stats = pool.stats()
+            print(f"[pool of {max_readers:>2}]       {threads:>2} threads: {qps:>10,.0f} reads/s  "
+                  f"wait mean {stats.get('wait_mean_ms', 0):.3f} ms, "
+                  f"p99 {stats.get('wait_p99_ms', 0):.3f} ms")
+            writes += stats['writes']
+
+        writing.clear()
+        writer.join()
+        print(f"\n[Stats] {writes:,} writes committed during the pool runs")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Demo: SQLite reader pool with a queued writer")
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Measure read QPS as reader threads scale, against connect-per-query'
+    )
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows in the benchmark table')
+    parser.add_argument('--readers', type=int, default=8, help='Reader connections in the pool')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Duration of each run')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows, args.readers, args.seconds)
+    else:
+        demo()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Reader/Writer Contention Load Generator
+
+Goal: Measure how SQLite's journal and locking modes behave under a sustained
+      mix of readers and writers, instead of the single timings that
+      concurrent_readers.py prints.
+
+Concept:
+- N reader and M writer processes each run for --duration seconds at a target
+  rate of --rate operations per second (0 = as fast as possible).
+- Every combination of journal_mode (DELETE, TRUNCATE, WAL, and WAL2 where the
+  SQLite build supports it) and locking_mode (NORMAL, EXCLUSIVE) is run on a
+  fresh database.
+- Latency is measured from each operation's scheduled start. An operation
+  that is late because the previous one stalled therefore counts its waiting
+  time, and stalls are not hidden (no coordinated omission).
+- An operation that still cannot get its lock after --busy-timeout-ms fails
+  with SQLITE_BUSY ("database is locked"). These failures are counted apart
+  from successful operations.
+- Results per mode and role: operations, throughput, p50/p95/p99/max latency,
+  BUSY count. They can be written as CSV and/or JSON for comparison.
+
+Usage:
+    python sqlite/contention_load.py
+    python sqlite/contention_load.py --readers 8 --writers 2 --rate 500 --duration 5
+    python sqlite/contention_load.py --journal-modes WAL --csv wal.csv --json wal.json
+"""
+from multiprocessing import Process, Queue
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import sqlite3
+import tempfile
+import time
+
+JOURNAL_MODES = ["DELETE", "TRUNCATE", "WAL", "WAL2"]
+LOCKING_MODES = ["NORMAL", "EXCLUSIVE"]
+TABLE_ROWS = 10_000
+
+READ_SQL = "SELECT sum(value) FROM kv WHERE id BETWEEN ? AND ?;"
+WRITE_SQL = "UPDATE kv SET value = value + 1 WHERE id = ?;"
+
+
+def supported_journal_modes(modes):
+    """Modes this SQLite build accepts; unsupported ones silently keep the old mode."""
+    supported = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in modes:
+            conn = sqlite3.connect(os.path.join(tmp_dir, f"{mode}.db"))
+            result, = conn.execute(f"PRAGMA journal_mode = {mode};").fetchone()
+            conn.close()
+            if result.upper() == mode:
+                supported.append(mode)
+            else:
+                print(f"[Setup] journal_mode={mode} not supported by SQLite "
+                      f"{sqlite3.sqlite_version} (got {result!r}); skipping", flush=True)
+    return supported
+
+
+def setup_database(path, journal_mode):
+    for suffix in ('', '-journal', '-wal', '-wal2', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode};")
+    conn.execute("CREATE TABLE kv (id INTEGER PRIMARY KEY, value INTEGER NOT NULL);")
+    conn.executemany("INSERT INTO kv (id, value) VALUES (?, 0);", ((i,) for i in range(TABLE_ROWS)))
+    conn.commit()
+    conn.close()
+
+
+def worker(role, n, path, journal_mode, locking_mode, rate, duration, busy_timeout, start_at, results):
+    """Run one reader or writer and always report back, even if it fails."""
+    try:
+        results.put(run_worker(role, n, path, journal_mode, locking_mode, rate, duration,
+                               busy_timeout, start_at) + (None,))
+    except Exception as e:
+        results.put((role, [], 0, 1, f"{type(e).__name__}: {e}"))
+
+
+def run_worker(role, n, path, journal_mode, locking_mode, rate, duration, busy_timeout, start_at):
+    """Run one reader or writer until the deadline; return (role, latencies, busy, errors)."""
+    conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+    # journal_mode (except WAL) and locking_mode are per connection.
+    conn.execute(f"PRAGMA locking_mode = {locking_mode};")
+    try:
+        conn.execute(f"PRAGMA journal_mode = {journal_mode};")
+    except sqlite3.OperationalError:
+        pass  # another process holds the lock; the mode set at setup still applies
+    rng = random.Random(f"{role}{n}")
+    latencies, busy, errors = [], 0, 0
+    interval = 1 / rate if rate else 0
+
+    time.sleep(max(0, start_at - time.time()))
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+    scheduled = started_at
+    while scheduled < deadline:
+        now = time.perf_counter()
+        if now < scheduled:
+            time.sleep(scheduled - now)
+        elif not interval:
+            scheduled = now
+        try:
+            if role == "reader":
+                start = rng.randrange(TABLE_ROWS - 100)
+                conn.execute(READ_SQL, (start, start + 100)).fetchone()
+            else:
+                conn.execute(WRITE_SQL, (rng.randrange(TABLE_ROWS),))
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                busy += 1
+            else:
+                errors += 1
+        scheduled += interval
+    conn.close()
+    return role, latencies, busy, errors
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))], 3)
+
+
+def run_mode(path, journal_mode, locking_mode, readers, writers, rate, duration, busy_timeout):
+    """Run one journal/locking combination; return one result row per role."""
+    setup_database(path, journal_mode)
+    results = Queue()
+    start_at = time.time() + 0.5  # let every process connect before the clock starts
+    processes = [
+        Process(target=worker, args=(role, n, path, journal_mode, locking_mode, rate, duration,
+                                     busy_timeout, start_at, results))
+        for role, count in (("reader", readers), ("writer", writers))
+        for n in range(count)
+    ]
+    for process in processes:
+        process.start()
+    collected = []
+    while len(collected) < len(processes):
+        try:
+            collected.append(results.get(timeout=1))
+        except queue.Empty:
+            if any(process.is_alive() for process in processes):
+                continue
+            # Every worker has exited: take what is still in the pipe, then stop
+            # waiting for workers that died without reporting (e.g. killed by a signal).
+            try:
+                while len(collected) < len(processes):
+                    collected.append(results.get(timeout=0.5))
+            except queue.Empty:
+                pass
+            break
+    for process in processes:
+        process.join()
+    for role, _, _, _, failure in collected:
+        if failure:
+            print(f"  ✗ {journal_mode}/{locking_mode} {role} failed: {failure}", flush=True)
+    if len(collected) < len(processes):
+        print(f"  ✗ {journal_mode}/{locking_mode}: {len(processes) - len(collected)} worker(s) "
+              f"exited without results (exit codes {[p.exitcode for p in processes]})", flush=True)
+
+    rows = []
+    for role in ("reader", "writer"):
+        mine = [entry for entry in collected if entry[0] == role]
+        if not mine:
+            continue
+        latencies = sorted(latency for entry in mine for latency in entry[1])
+        rows.append({
+            "journal_mode": journal_mode,
+            "locking_mode": locking_mode,
+            "role": role,
+            "workers": len(mine),
+            "ops": len(latencies),
+            "ops_per_second": round(len(latencies) / duration, 1),
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": round(latencies[-1], 3) if latencies else None,
+            "busy": sum(entry[2] for entry in mine),
+            "errors": sum(entry[3] for entry in mine),
+        })
+    return rows
+
+
+def print_rows(rows):
+    def ms(value):
+        return f"{value:9.2f}" if value is not None else f"{'-':>9}"
+
+    for row in rows:
+        print(f"  {row['journal_mode']:<9} {row['locking_mode']:<9} {row['role']:<6} "
+              f"{row['ops_per_second']:>9,.0f} ops/s  p50 {ms(row['p50_ms'])}  "
+              f"p95 {ms(row['p95_ms'])}  p99 {ms(row['p99_ms'])}  max {ms(row['max_ms'])} ms  "
+              f"BUSY {row['busy']:>6,}", flush=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test SQLite journal and locking modes")
+    parser.add_argument('--readers', type=int, default=3, help='Reader processes')
+    parser.add_argument('--writers', type=int, default=1, help='Writer processes')
+    parser.add_argument('--rate', type=float, default=200, help='Target ops/s per process (0 = max)')
+    parser.add_argument('--duration', type=float, default=2.0, help='Seconds per mode combination')
+    parser.add_argument('--busy-timeout-ms', type=int, default=100, help='sqlite3 busy timeout')
+    parser.add_argument('--journal-modes', nargs='+', default=JOURNAL_MODES, type=str.upper)
+    parser.add_argument('--locking-modes', nargs='+', default=LOCKING_MODES, type=str.upper,
+                        choices=LOCKING_MODES)
+    parser.add_argument('--csv', help='Write the results to this CSV file')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    journal_modes = supported_journal_modes(args.journal_modes)
+    print(f"[Setup] {args.readers} readers, {args.writers} writers, "
+          f"{args.rate:g} ops/s each, {args.duration:g}s per mode, "
+          f"busy timeout {args.busy_timeout_ms} ms", flush=True)
+
+    all_rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "contention.db")
+        for journal_mode in journal_modes:
+            for locking_mode in args.locking_modes:
+                rows = run_mode(path, journal_mode, locking_mode, args.readers, args.writers,
+                                args.rate, args.duration, args.busy_timeout_ms / 1000)
+                print_rows(rows)
+                all_rows += rows
+
+    if not all_rows:
+        print("✗ No journal mode could be run; no results to report.")
+    if args.csv and all_rows:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(all_rows[0]))
+            writer.writeheader()
+            writer.writerows(all_rows)
+        print(f"✓ Results written to {args.csv}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"sqlite": sqlite3.sqlite_version, "config": vars(args), "results": all_rows},
+                      f, indent=2)
+        print(f"✓ Results written to {args.json}")
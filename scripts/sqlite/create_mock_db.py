@@ -3,10 +3,121 @@ Mock Database Creator
 
 This script demonstrates how to create and populate a SQLite database with timestamped records.
 Goal: Create a sample database with a large number of rows for testing and demonstration purposes.
+
+Row i gets the timestamp start + i microseconds. Instead of building a datetime
+and calling strftime for every row, timestamp_rows formats the "YYYY-MM-DD HH:MM:SS."
+prefix once per second and only appends the six microsecond digits per row.
+
+append_rows_parallel splits the row range into contiguous shards. A process pool
+fills one temporary SQLite file per shard, using explicit ids and the shared base
+timestamp, and the parent merges the shards in id order with ATTACH and
+INSERT ... SELECT. The result is the same table that append_rows builds.
+
+append_rows_resumable commits every few batches together with a high-water mark
+in the load_progress table, so an interrupted load continues where the last
+commit left off instead of starting over.
+
+Usage:
+    python sqlite/create_mock_db.py
+    python sqlite/create_mock_db.py --database load.db --rows 1000000 --batch-size 5000 \\
+        --pragma-profile bulk_load --transaction-size 100000 --metrics-json metrics.json
+    python sqlite/create_mock_db.py --benchmark
+    python sqlite/create_mock_db.py --parallel-benchmark --rows 2000000
+    python sqlite/create_mock_db.py --rows 50000000 --load-id nightly  # rerun to resume
+    python sqlite/create_mock_db.py --resume-benchmark
 """
 import sqlite3
 from datetime import datetime, timedelta
+from contextlib import redirect_stdout
+from multiprocessing import Pool, Process
+import argparse
+import io
+import json
 import os
+import shutil
+import tempfile
+import time
+
+MICROSECONDS_PER_SECOND = 1_000_000
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# PRAGMA settings applied right after connecting, in order.
+# "bulk_load" trades crash safety for speed: with no journal and no fsyncs a crash
+# mid-load can corrupt the file, which is fine for throwaway test databases.
+PRAGMA_PROFILES = {
+    "default": {},
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+    },
+    "bulk_load": {
+        "journal_mode": "OFF",
+        "synchronous": "OFF",
+        "locking_mode": "EXCLUSIVE",
+        "temp_store": "MEMORY",
+        "cache_size": -262144,  # 256 MiB
+    },
+    "bulk_load_memory_journal": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "temp_store": "MEMORY",
+        "cache_size": -262144,
+    },
+}
+
+# Journal modes without a rollback journal or WAL on disk: a crash can leave
+# half a transaction in the file, so a committed checkpoint proves nothing.
+NON_DURABLE_JOURNAL_MODES = ("off", "memory")
+
+# Table layouts for example_table. "text" is the original 26-byte string column;
+# the epoch layouts store microseconds since 1970-01-01 as an INTEGER (naive
+# timestamps are treated as UTC), which takes 8 bytes or less and compares as a
+# number. Range indexes are listed separately so they can be built after a load.
+TABLE_LAYOUTS = {
+    "text": {
+        "create": """CREATE TABLE IF NOT EXISTS example_table (
+                         id integer PRIMARY KEY AUTOINCREMENT,
+                         timestamp text NOT NULL
+                     );""",
+        "indexes": [],
+    },
+    "text_indexed": {
+        "create": """CREATE TABLE IF NOT EXISTS example_table (
+                         id integer PRIMARY KEY AUTOINCREMENT,
+                         timestamp text NOT NULL
+                     );""",
+        "indexes": ["CREATE INDEX IF NOT EXISTS idx_example_table_timestamp "
+                    "ON example_table(timestamp);"],
+    },
+    "epoch": {
+        "create": """CREATE TABLE IF NOT EXISTS example_table (
+                         id integer PRIMARY KEY AUTOINCREMENT,
+                         timestamp integer NOT NULL
+                     );""",
+        "indexes": ["CREATE INDEX IF NOT EXISTS idx_example_table_timestamp "
+                    "ON example_table(timestamp);"],
+    },
+    # Rows are stored in timestamp order in the table B-tree itself, so a
+    # range scan reads consecutive pages and needs no separate index.
+    "epoch_clustered": {
+        "create": """CREATE TABLE IF NOT EXISTS example_table (
+                         timestamp integer NOT NULL,
+                         id integer NOT NULL,
+                         PRIMARY KEY (timestamp, id)
+                     ) WITHOUT ROWID;""",
+        "indexes": [],
+    },
+}
+
+EPOCH = datetime(1970, 1, 1)
+
+def to_epoch_us(timestamp):
+    """Microseconds since 1970-01-01 for a naive datetime."""
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+def from_epoch_us(microseconds):
+    """Inverse of to_epoch_us."""
+    return EPOCH + timedelta(microseconds=microseconds)
 
 def create_connection(db_file):
     """
@@ -28,91 +139,677 @@ def create_connection(db_file):
 
     return conn
 
-def create_table(conn):
+def apply_pragma_profile(conn, profile):
+    """
+    Apply one of the PRAGMA_PROFILES to a connection.
+    
+    Args:
+        conn (sqlite3.Connection): Database connection object
+        profile (str): Key of PRAGMA_PROFILES
+    """
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(f"Unknown pragma profile {profile!r}; choose from {sorted(PRAGMA_PROFILES)}")
+    for pragma, value in PRAGMA_PROFILES[profile].items():
+        conn.execute(f"PRAGMA {pragma} = {value};")
+
+def create_table(conn, layout="text"):
     """
     Create a table if it does not exist.
     
     Args:
         conn (sqlite3.Connection): Database connection object
+        layout (str): Key of TABLE_LAYOUTS
     """
+    if layout not in TABLE_LAYOUTS:
+        raise ValueError(f"Unknown table layout {layout!r}; choose from {sorted(TABLE_LAYOUTS)}")
     try:
-        sql_create_table = """ CREATE TABLE IF NOT EXISTS example_table (
-                                    id integer PRIMARY KEY AUTOINCREMENT,
-                                    timestamp text NOT NULL
-                                ); """
         cursor = conn.cursor()
-        cursor.execute(sql_create_table)
+        cursor.execute(TABLE_LAYOUTS[layout]["create"])
         print("✓ Table 'example_table' created or already exists.")
     except sqlite3.Error as e:
         print(f"✗ Error creating table: {e}")
 
-def append_rows(conn, num_rows=1):
+def timestamp_rows_reference(base, start_index, count):
+    """
+    Build timestamp rows the straightforward way: one datetime and strftime per row.
+
+    Kept as the reference that timestamp_rows must match exactly.
+    """
+    rows = []
+    for row_index in range(start_index, start_index + count):
+        seconds_offset = row_index // MICROSECONDS_PER_SECOND
+        microsecond = row_index % MICROSECONDS_PER_SECOND
+        timestamp = base + timedelta(seconds=seconds_offset, microseconds=microsecond)
+        rows.append((timestamp.strftime(TIMESTAMP_FORMAT),))
+    return rows
+
+def timestamp_rows(base, start_index, count):
+    """
+    Build rows [(timestamp,), ...] for row indexes start_index .. start_index + count - 1.
+
+    Args:
+        base (datetime): Timestamp of row 0
+        start_index (int): Index of the first row
+        count (int): Number of rows
+
+    Returns:
+        list: One 1-tuple per row, ready for executemany
+    """
+    # The per-second prefix below needs a whole-second base; fold any
+    # microseconds into the row index instead of dropping them.
+    start_index += base.microsecond
+    base = base.replace(microsecond=0)
+    rows = []
+    end_index = start_index + count
+    row_index = start_index
+    while row_index < end_index:
+        second, first_microsecond = divmod(row_index, MICROSECONDS_PER_SECOND)
+        prefix = (base + timedelta(seconds=second)).strftime("%Y-%m-%d %H:%M:%S.")
+        last_microsecond = min(MICROSECONDS_PER_SECOND, first_microsecond + end_index - row_index)
+        rows += [
+            (f"{prefix}{microsecond:06d}",)
+            for microsecond in range(first_microsecond, last_microsecond)
+        ]
+        row_index += last_microsecond - first_microsecond
+    return rows
+
+def epoch_rows(base, start_index, count):
+    """Integer counterpart of timestamp_rows: [(microseconds since epoch,), ...]."""
+    first = to_epoch_us(base) + start_index
+    return [(microseconds,) for microseconds in range(first, first + count)]
+
+def layout_rows(layout, base, start_index, count):
+    """Timestamp rows in the representation that the table layout stores."""
+    if layout.startswith("epoch"):
+        return epoch_rows(base, start_index, count)
+    return timestamp_rows(base, start_index, count)
+
+def create_indexes(conn, layout="text"):
+    """
+    Build the layout's range indexes; called after loading, which is cheaper
+    than keeping the index up to date row by row.
+    """
+    for statement in TABLE_LAYOUTS[layout]["indexes"]:
+        conn.execute(statement)
+    conn.commit()
+
+def range_query(layout, start, end, columns="id, timestamp"):
+    """
+    Translate a [start, end) time range into SQL for the given layout.
+    
+    Args:
+        layout (str): Key of TABLE_LAYOUTS
+        start (datetime): Inclusive lower bound
+        end (datetime): Exclusive upper bound
+        columns (str): Select list
+        
+    Returns:
+        tuple: (sql, params)
+    """
+    if layout.startswith("epoch"):
+        params = (to_epoch_us(start), to_epoch_us(end))
+    else:
+        # Fixed-width "YYYY-MM-DD HH:MM:SS.ffffff" strings sort like the times they encode.
+        params = (start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT))
+    sql = (f"SELECT {columns} FROM example_table "
+           "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp")
+    return sql, params
+
+def fetch_range(conn, layout, start, end):
+    """Rows of example_table in [start, end), timestamps returned as datetimes."""
+    rows = conn.execute(*range_query(layout, start, end)).fetchall()
+    if layout.startswith("epoch"):
+        return [(row_id, from_epoch_us(ts)) for row_id, ts in rows]
+    return [(row_id, datetime.strptime(ts, TIMESTAMP_FORMAT)) for row_id, ts in rows]
+
+def append_rows(conn, num_rows=1, base=None, batch_size=1000, transaction_size=None,
+                layout="text"):
     """
     Append rows to the table with progress indicators.
     
     Args:
         conn (sqlite3.Connection): Database connection object
         num_rows (int): Number of rows to insert
+        base (datetime): Timestamp of the first row (defaults to now, truncated to seconds)
+        batch_size (int): Rows per executemany call
+        transaction_size (int): Commit after about this many rows (default: one commit at the end)
+        layout (str): Key of TABLE_LAYOUTS that example_table was created with
+        
+    Returns:
+        int: Number of commits, or None if an error occurred
     """
     try:
         cursor = conn.cursor()
         print(f"Inserting {num_rows:,} rows...")
         
-        # Constants for timestamp generation
-        BATCH_SIZE = 1000
-        MICROSECONDS_PER_SECOND = 1_000_000
+        commits = 0
+        rows_since_commit = 0
         
-        start_time = datetime.now()
+        # The clustered layout has no rowid to number rows, so ids are explicit.
+        explicit_ids = layout == "epoch_clustered"
+        if explicit_ids:
+            first_id = cursor.execute(
+                "SELECT coalesce(max(id), 0) + 1 FROM example_table").fetchone()[0]
+            insert_sql = "INSERT INTO example_table(timestamp, id) VALUES(?, ?)"
+        else:
+            insert_sql = "INSERT INTO example_table(timestamp) VALUES(?)"
         
-        for i in range(0, num_rows, BATCH_SIZE):
-            rows_to_insert = min(BATCH_SIZE, num_rows - i)
-            
-            # Generate unique timestamps for each row
-            # Each row gets a unique timestamp with microsecond precision
-            timestamps = []
-            for j in range(rows_to_insert):
-                row_index = i + j
-                # Calculate time offset to ensure uniqueness
-                seconds_offset = row_index // MICROSECONDS_PER_SECOND
-                microsecond = row_index % MICROSECONDS_PER_SECOND
-                timestamp = (start_time.replace(microsecond=0) + 
-                            timedelta(seconds=seconds_offset, microseconds=microsecond))
-                timestamps.append((timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),))
+        # Each row gets a unique timestamp with microsecond precision
+        if base is None:
+            base = datetime.now().replace(microsecond=0)
+        
+        for i in range(0, num_rows, batch_size):
+            rows_to_insert = min(batch_size, num_rows - i)
+            timestamps = layout_rows(layout, base, i, rows_to_insert)
+            if explicit_ids:
+                timestamps = [(ts, first_id + i + j) for j, (ts,) in enumerate(timestamps)]
             
             # Insert batch
-            cursor.executemany(
-                "INSERT INTO example_table(timestamp) VALUES(?)",
-                timestamps
-            )
+            cursor.executemany(insert_sql, timestamps)
+            
+            rows_since_commit += rows_to_insert
+            if transaction_size and rows_since_commit >= transaction_size:
+                conn.commit()
+                commits += 1
+                rows_since_commit = 0
             
             # Progress indicator
             if (i + rows_to_insert) % 10000 == 0 or (i + rows_to_insert) == num_rows:
                 print(f"  Progress: {i + rows_to_insert:,} / {num_rows:,} rows inserted")
         
-        conn.commit()
+        if rows_since_commit:
+            conn.commit()
+            commits += 1
         print(f"✓ Successfully inserted {num_rows:,} rows")
+        return commits
     except sqlite3.Error as e:
         print(f"✗ Error inserting rows: {e}")
 
-def main():
+def append_rows_resumable(conn, num_rows, load_id="default", batch_size=1000,
+                          checkpoint_batches=None, layout="text", on_batch=None):
+    """
+    Append rows in checkpointed transactions that a restarted load picks up again.
+    
+    The load_progress table holds one row per load_id with its base timestamp,
+    first id and high-water mark (rows_done). Every checkpoint_batches batches,
+    the new rows and the updated high-water mark are committed in the same
+    transaction, so after a crash the mark always matches the committed rows.
+    Calling again with the same load_id continues right after the mark; ids and
+    timestamps are derived from the row index, so the result is the same as an
+    uninterrupted load. The connection must use a rollback journal or WAL:
+    with journal_mode OFF or MEMORY a crash can leave rows beyond the mark or
+    lose rows below it, so such connections are refused.
+    
+    Args:
+        conn (sqlite3.Connection): Database connection object
+        num_rows (int): Total rows of the load (must match when resuming)
+        load_id (str): Name identifying the load across restarts
+        batch_size (int): Rows per executemany call
+        checkpoint_batches (int): Batches per commit (default: about 10 checkpoints per load)
+        layout (str): Key of TABLE_LAYOUTS that example_table was created with
+        on_batch (callable): Called with rows_done after every batch
+        
+    Returns:
+        int: Number of commits made by this call
+    """
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+    if journal_mode in NON_DURABLE_JOURNAL_MODES:
+        raise ValueError(
+            f"Resumable loads need a rollback journal or WAL, not journal_mode={journal_mode.upper()}"
+        )
+    if checkpoint_batches is None:
+        checkpoint_batches = max(1, -(-num_rows // batch_size) // 10)
+    conn.execute("""CREATE TABLE IF NOT EXISTS load_progress (
+                        load_id text PRIMARY KEY,
+                        base text NOT NULL,
+                        first_id integer NOT NULL,
+                        target_rows integer NOT NULL,
+                        rows_done integer NOT NULL,
+                        updated_at text NOT NULL
+                    );""")
+    progress = conn.execute(
+        "SELECT base, first_id, target_rows, rows_done FROM load_progress WHERE load_id = ?",
+        (load_id,)
+    ).fetchone()
+    if progress is None:
+        base = datetime.now().replace(microsecond=0)
+        first_id = conn.execute("SELECT coalesce(max(id), 0) + 1 FROM example_table").fetchone()[0]
+        rows_done = 0
+        conn.execute(
+            "INSERT INTO load_progress VALUES(?, ?, ?, ?, 0, ?)",
+            (load_id, base.isoformat(sep=" "), first_id, num_rows, datetime.now().isoformat(sep=" "))
+        )
+        conn.commit()
+    else:
+        base_text, first_id, target_rows, rows_done = progress
+        if target_rows != num_rows:
+            raise ValueError(f"Load {load_id!r} was started with {target_rows:,} rows, not {num_rows:,}")
+        base = datetime.fromisoformat(base_text)
+        print(f"Resuming load {load_id!r} at row {rows_done:,} / {num_rows:,}")
+
+    if rows_done >= num_rows:
+        print(f"✓ Load {load_id!r} is already complete")
+        return 0
+    print(f"Inserting {num_rows - rows_done:,} rows (checkpoint every {checkpoint_batches} batches)...")
+
+    commits = 0
+    batches = 0
+    for i in range(rows_done, num_rows, batch_size):
+        rows_to_insert = min(batch_size, num_rows - i)
+        timestamps = layout_rows(layout, base, i, rows_to_insert)
+        conn.executemany(
+            "INSERT INTO example_table(id, timestamp) VALUES(?, ?)",
+            ((first_id + i + j, ts) for j, (ts,) in enumerate(timestamps))
+        )
+        batches += 1
+        rows_done = i + rows_to_insert
+        if batches % checkpoint_batches == 0 or rows_done == num_rows:
+            conn.execute(
+                "UPDATE load_progress SET rows_done = ?, updated_at = ? WHERE load_id = ?",
+                (rows_done, datetime.now().isoformat(sep=" "), load_id)
+            )
+            conn.commit()
+            commits += 1
+            print(f"  Checkpoint: {rows_done:,} / {num_rows:,} rows committed")
+        if on_batch is not None:
+            on_batch(rows_done)
+
+    print(f"✓ Successfully inserted {num_rows:,} rows")
+    return commits
+
+def _load_shard(shard):
+    """
+    Worker: write rows first_id .. first_id + count - 1 into a fresh shard file.
+
+    Timestamps are computed from the row index relative to the whole load, so the
+    shards line up exactly with what a single append_rows call would write.
+    """
+    path, base, start_index, first_id, count, batch_size, layout = shard
+    conn = sqlite3.connect(path)
+    apply_pragma_profile(conn, "bulk_load")  # shard files are thrown away after the merge
+    conn.execute("CREATE TABLE example_table (id INTEGER PRIMARY KEY, timestamp NOT NULL);")
+    for offset in range(0, count, batch_size):
+        rows_to_insert = min(batch_size, count - offset)
+        timestamps = layout_rows(layout, base, start_index + offset, rows_to_insert)
+        conn.executemany(
+            "INSERT INTO example_table(id, timestamp) VALUES(?, ?)",
+            ((first_id + offset + j, ts) for j, (ts,) in enumerate(timestamps))
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+def append_rows_parallel(conn, num_rows, workers=None, base=None, batch_size=1000,
+                         layout="text"):
+    """
+    Append rows using a process pool that writes one temporary shard per worker.
+    
+    Args:
+        conn (sqlite3.Connection): Connection to the target database (must be a file)
+        num_rows (int): Number of rows to insert
+        workers (int): Worker processes (defaults to the CPU count)
+        base (datetime): Timestamp of the first row (defaults to now, truncated to seconds)
+        batch_size (int): Rows per executemany call inside each worker
+        layout (str): Key of TABLE_LAYOUTS that example_table was created with
+        
+    Returns:
+        dict: Seconds spent in the "shards" and "merge" phases, and the merge "commits"
+    """
+    if num_rows < 1:
+        return {"shards": 0.0, "merge": 0.0, "commits": 0}
+    workers = workers or os.cpu_count() or 1
+    if base is None:
+        base = datetime.now().replace(microsecond=0)
+    first_id = conn.execute("SELECT coalesce(max(id), 0) + 1 FROM example_table").fetchone()[0]
+
+    database = conn.execute("PRAGMA database_list").fetchone()[2]
+    shard_dir = tempfile.mkdtemp(prefix="shards-", dir=os.path.dirname(database) or None)
+    shard_size = -(-num_rows // workers)
+    shards = [
+        (os.path.join(shard_dir, f"shard_{n}.db"), base, start, first_id + start,
+         min(shard_size, num_rows - start), batch_size, layout)
+        for n, start in enumerate(range(0, num_rows, shard_size))
+    ]
+    print(f"Inserting {num_rows:,} rows with {len(shards)} worker processes...")
+
+    try:
+        started_at = time.perf_counter()
+        with Pool(len(shards)) as pool:
+            paths = pool.map(_load_shard, shards)
+        shards_secs = time.perf_counter() - started_at
+
+        # Shards cover consecutive id ranges, so merging them in order appends
+        # to the right edge of the B-tree instead of splitting pages.
+        started_at = time.perf_counter()
+        for n, path in enumerate(paths):
+            conn.execute("ATTACH DATABASE ? AS shard", (path,))
+            conn.execute(
+                "INSERT INTO example_table(id, timestamp) "
+                "SELECT id, timestamp FROM shard.example_table ORDER BY id"
+            )
+            conn.commit()
+            conn.execute("DETACH DATABASE shard")
+            print(f"  Merged shard {n + 1} / {len(paths)}")
+        merge_secs = time.perf_counter() - started_at
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    print(f"✓ Successfully inserted {num_rows:,} rows "
+          f"(shards {shards_secs:.2f}s, merge {merge_secs:.2f}s)")
+    return {"shards": shards_secs, "merge": merge_secs, "commits": len(paths)}
+
+def estimate_fsyncs(conn, commits):
+    """
+    Rough number of fsync() calls that the given number of commits cost.
+    
+    SQLite does not report fsyncs, so this is a heuristic from the journal mode
+    and synchronous level: a rollback journal syncs the journal and the database
+    on each commit (FULL adds a journal header sync), WAL with synchronous=FULL
+    syncs the WAL once per commit, and WAL with NORMAL only syncs at checkpoints.
+    """
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]  # 0=OFF 1=NORMAL 2=FULL 3=EXTRA
+    if synchronous == 0:
+        return 0
+    if journal_mode == "wal":
+        return commits if synchronous >= 2 else 0
+    if journal_mode in NON_DURABLE_JOURNAL_MODES:
+        return commits
+    return commits * (3 if synchronous >= 2 else 2)
+
+def file_metrics(conn, database):
+    """Final database size as seen by the filesystem and by SQLite."""
+    size = os.path.getsize(database)
+    wal_size = os.path.getsize(database + "-wal") if os.path.exists(database + "-wal") else 0
+    return {
+        "file_size_bytes": size,
+        "wal_size_bytes": wal_size,
+        "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+        "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+        "freelist_count": conn.execute("PRAGMA freelist_count").fetchone()[0],
+    }
+
+def phase_metrics(conn, name, rows, seconds, commits):
+    return {
+        "phase": name,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(rows / seconds) if seconds and rows else None,
+        "commits": commits,
+        "estimated_fsyncs": estimate_fsyncs(conn, commits),
+    }
+
+def main(args):
     """
     Main function to create database, table, and populate with sample data.
+    
+    Args:
+        args (argparse.Namespace): Parsed command-line options
+        
+    Returns:
+        dict: Configuration, per-phase metrics and final file metrics
     """
-    database = "database.db"
+    database = args.database
 
     # Create a database connection
     conn = create_connection(database)
-    if conn is not None:
-        # Create table
-        create_table(conn)
+    if conn is None:
+        print("✗ Error! Cannot create the database connection.")
+        return None
 
-        # Append rows (change num_rows as needed)
-        append_rows(conn, num_rows=100000)
+    apply_pragma_profile(conn, args.pragma_profile)
+    phases = []
 
-        conn.close()
-        print("✓ Database connection closed")
+    started_at = time.perf_counter()
+    create_table(conn, args.layout)
+    conn.commit()
+    phases.append(phase_metrics(conn, "create_table", 0, time.perf_counter() - started_at, 1))
+
+    if args.load_id:
+        started_at = time.perf_counter()
+        commits = append_rows_resumable(conn, args.rows, args.load_id, args.batch_size,
+                                        args.checkpoint_batches, args.layout)
+        phases.append(phase_metrics(conn, "insert", args.rows, time.perf_counter() - started_at,
+                                    commits))
+    elif args.workers:
+        result = append_rows_parallel(conn, args.rows, args.workers, batch_size=args.batch_size,
+                                      layout=args.layout)
+        # Shard files are written with synchronous=OFF, so only the merge commits sync.
+        phases.append(phase_metrics(conn, "shards", args.rows, result["shards"], 0))
+        phases.append(phase_metrics(conn, "merge", args.rows, result["merge"], result["commits"]))
     else:
-        print("✗ Error! Cannot create the database connection.")
+        started_at = time.perf_counter()
+        commits = append_rows(conn, args.rows, batch_size=args.batch_size,
+                              transaction_size=args.transaction_size, layout=args.layout)
+        phases.append(phase_metrics(conn, "insert", args.rows, time.perf_counter() - started_at,
+                                    commits or 0))
+
+    if TABLE_LAYOUTS[args.layout]["indexes"]:
+        started_at = time.perf_counter()
+        create_indexes(conn, args.layout)
+        phases.append(phase_metrics(conn, "index", args.rows, time.perf_counter() - started_at, 1))
+
+    metrics = {
+        "config": {
+            "database": database,
+            "rows": args.rows,
+            "batch_size": args.batch_size,
+            "transaction_size": args.transaction_size,
+            "pragma_profile": args.pragma_profile,
+            "workers": args.workers,
+            "layout": args.layout,
+            "load_id": args.load_id,
+            "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+            "synchronous": conn.execute("PRAGMA synchronous").fetchone()[0],
+            "sqlite_version": sqlite3.sqlite_version,
+        },
+        "phases": phases,
+        "file": file_metrics(conn, database),
+    }
+    conn.close()
+    print("✓ Database connection closed")
+
+    for phase in phases:
+        rate = f"{phase['rows_per_second']:>12,} rows/s" if phase['rows_per_second'] else " " * 19
+        print(f"  {phase['phase']:<12} {phase['seconds']:8.3f}s {rate}  "
+              f"commits={phase['commits']}  fsyncs≈{phase['estimated_fsyncs']}")
+    file = metrics["file"]
+    print(f"  file: {file['file_size_bytes']:,} bytes, "
+          f"{file['page_count']:,} pages x {file['page_size']} bytes"
+          + (f" (+{file['wal_size_bytes']:,} bytes not yet checkpointed from the WAL)"
+             if file['wal_size_bytes'] else ""))
+
+    if args.metrics_json:
+        if args.metrics_json == "-":
+            print(json.dumps(metrics, indent=2))
+        else:
+            with open(args.metrics_json, "w") as f:
+                json.dump(metrics, f, indent=2)
+            print(f"✓ Metrics written to {args.metrics_json}")
+    return metrics
+
+def benchmark(num_rows=1_000_000, batch_size=1000):
+    """Compare rows/s of the per-row and the per-second timestamp formatting."""
+    base = datetime.now().replace(microsecond=0)
+    # Start just before a second boundary so batches also cross seconds.
+    start_index = MICROSECONDS_PER_SECOND - num_rows // 2
+    assert timestamp_rows(base, start_index, num_rows) == \
+        timestamp_rows_reference(base, start_index, num_rows)
+    print(f"✓ Identical output for {num_rows:,} rows")
+
+    for name, build in (("before (strftime per row)", timestamp_rows_reference),
+                        ("after (prefix per second)", timestamp_rows)):
+        started_at = time.perf_counter()
+        for i in range(0, num_rows, batch_size):
+            build(base, start_index + i, min(batch_size, num_rows - i))
+        elapsed = time.perf_counter() - started_at
+        print(f"  {name}: {num_rows / elapsed:>12,.0f} rows/s")
+
+def parallel_benchmark(num_rows=1_000_000):
+    """Compare wall-clock time of append_rows and append_rows_parallel with growing worker counts."""
+    cpu_count = os.cpu_count() or 1
+    print(f"{cpu_count} CPU cores available; speedup beyond that count is not expected.")
+    base = datetime(2024, 1, 1)
+    worker_counts = sorted({1, 2, 4, cpu_count})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def run(workers):
+            path = os.path.join(tmp_dir, f"parallel_{workers}.db")
+            conn = sqlite3.connect(path)
+            conn.execute("""CREATE TABLE example_table (
+                                id integer PRIMARY KEY AUTOINCREMENT,
+                                timestamp text NOT NULL
+                            );""")
+            started_at = time.perf_counter()
+            if workers == 0:
+                append_rows(conn, num_rows, base=base)
+            else:
+                append_rows_parallel(conn, num_rows, workers, base=base)
+            elapsed = time.perf_counter() - started_at
+            checksum = conn.execute(
+                "SELECT count(*), sum(id), max(timestamp) FROM example_table"
+            ).fetchone()
+            conn.close()
+            return elapsed, checksum
+
+        serial_secs, expected = run(0)
+        timings = []
+        for workers in worker_counts:
+            elapsed, checksum = run(workers)
+            assert checksum == expected, (checksum, expected)
+            timings.append((workers, elapsed))
+
+    print(f"\nappend_rows (serial): {serial_secs:8.2f}s  {num_rows / serial_secs:>12,.0f} rows/s")
+    for workers, elapsed in timings:
+        print(f"{workers:>2} worker processes:  {elapsed:8.2f}s  {num_rows / elapsed:>12,.0f} rows/s"
+              f"  speedup {serial_secs / elapsed:4.2f}x")
+
+def _crashing_load(path, num_rows, batch_size, checkpoint_batches, crash_at):
+    """Child process: run a checkpointed load and die abruptly after crash_at rows."""
+    def crash(rows_done):
+        if rows_done >= crash_at:
+            os._exit(1)  # no cleanup, no commit: like a kill -9 or a power cut
+
+    conn = sqlite3.connect(path)
+    with redirect_stdout(io.StringIO()):
+        append_rows_resumable(conn, num_rows, "crash-test", batch_size, checkpoint_batches,
+                              on_batch=crash)
+
+def resume_benchmark(num_rows=1_000_000, batch_size=1000, checkpoint_batches=None):
+    """Compare single-transaction and checkpointed loads, then crash and resume a load."""
+    if checkpoint_batches is None:
+        checkpoint_batches = max(1, -(-num_rows // batch_size) // 10)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def fresh(name):
+            conn = sqlite3.connect(os.path.join(tmp_dir, name))
+            with redirect_stdout(io.StringIO()):
+                create_table(conn)
+            conn.commit()
+            return conn
+
+        conn = fresh("single.db")
+        started_at = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            append_rows(conn, num_rows, batch_size=batch_size)
+        single_secs = time.perf_counter() - started_at
+        conn.close()
+
+        conn = fresh("checkpointed.db")
+        started_at = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            commits = append_rows_resumable(conn, num_rows, "full", batch_size, checkpoint_batches)
+        checkpointed_secs = time.perf_counter() - started_at
+        conn.close()
+
+        print(f"single transaction: {num_rows / single_secs:>12,.0f} rows/s  (1 commit)")
+        print(f"checkpointed:       {num_rows / checkpointed_secs:>12,.0f} rows/s  "
+              f"({commits} commits, {single_secs / checkpointed_secs:.0%} of single-transaction)")
+
+        path = os.path.join(tmp_dir, "crash.db")
+        fresh("crash.db").close()
+        crash_at = num_rows // 2 + batch_size // 2
+        child = Process(target=_crashing_load,
+                        args=(path, num_rows, batch_size, checkpoint_batches, crash_at))
+        child.start()
+        child.join()
+        conn = sqlite3.connect(path)
+        committed, = conn.execute("SELECT count(*) FROM example_table").fetchone()
+        mark, = conn.execute("SELECT rows_done FROM load_progress").fetchone()
+        print(f"\ncrashed after {crash_at:,} rows (exit code {child.exitcode}): "
+              f"{committed:,} rows committed, high-water mark {mark:,}")
+        assert 0 < mark == committed, "no checkpoint landed before the crash; lower --checkpoint-batches"
+
+        with redirect_stdout(io.StringIO()):
+            append_rows_resumable(conn, num_rows, "crash-test", batch_size, checkpoint_batches)
+        count, distinct, min_id, max_id = conn.execute(
+            "SELECT count(*), count(DISTINCT timestamp), min(id), max(id) FROM example_table"
+        ).fetchone()
+        conn.close()
+        assert count == distinct == max_id - min_id + 1 == num_rows
+        print(f"resumed: {count:,} rows, ids {min_id:,}..{max_id:,}, all timestamps unique ✓")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create and populate a sample SQLite database")
+    parser.add_argument('--database', default="database.db", help='SQLite file to create or append to')
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows to append')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per executemany call')
+    parser.add_argument(
+        '--transaction-size', type=int, default=None,
+        help='Commit after this many rows (default: one transaction for the whole load)'
+    )
+    parser.add_argument(
+        '--pragma-profile', choices=sorted(PRAGMA_PROFILES), default="default",
+        help='PRAGMA settings applied before loading'
+    )
+    parser.add_argument(
+        '--layout', choices=list(TABLE_LAYOUTS), default="text",
+        help='How example_table stores timestamps (see TABLE_LAYOUTS)'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=0,
+        help='Load through this many shard-writing processes (0 = single process)'
+    )
+    parser.add_argument(
+        '--load-id',
+        help='Checkpoint the load under this name and resume it when run again'
+    )
+    parser.add_argument(
+        '--checkpoint-batches', type=int, default=None,
+        help='Batches per checkpoint commit with --load-id (default: about 10 checkpoints per load)'
+    )
+    parser.add_argument(
+        '--metrics-json', metavar='PATH',
+        help='Write per-phase metrics as JSON to PATH ("-" for stdout)'
+    )
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Compare timestamp generation speed before and after batching'
+    )
+    parser.add_argument(
+        '--parallel-benchmark', action='store_true',
+        help='Compare serial and process-parallel loading of --rows rows for growing worker counts'
+    )
+    parser.add_argument(
+        '--resume-benchmark', action='store_true',
+        help='Crash a checkpointed load of --rows rows halfway, resume it and compare throughput'
+    )
+    args = parser.parse_args(argv)
+    if args.load_id and args.workers:
+        parser.error("--load-id cannot be combined with --workers")
+    journal_mode = PRAGMA_PROFILES[args.pragma_profile].get("journal_mode", "").lower()
+    if args.load_id and journal_mode in NON_DURABLE_JOURNAL_MODES:
+        parser.error(f"--load-id needs a rollback journal or WAL; "
+                     f"--pragma-profile {args.pragma_profile} uses journal_mode={journal_mode.upper()}")
+    return args
 
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+
+    if args.benchmark:
+        benchmark()
+    elif args.parallel_benchmark:
+        parallel_benchmark(args.rows)
+    elif args.resume_benchmark:
+        resume_benchmark(args.rows, args.batch_size, args.checkpoint_batches)
+    else:
+        main(args)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Group Commit: Coalescing Small Writes into Shared Transactions
+
+Goal: Stop paying one fsync per logical write. Many threads submit small
+      writes, and a single committer thread groups whatever arrives within
+      max_delay_ms (or max_batch operations) into one transaction.
+
+Concept:
+- With synchronous=FULL every COMMIT waits for the disk. One transaction per
+  write caps throughput at the number of fsyncs per second the disk can do.
+  One commit for 100 writes costs roughly the same as one commit for 1 write.
+- Each operation runs inside its own SAVEPOINT. If it fails, only that savepoint
+  is rolled back, and the caller gets the exception. The rest of the group
+  still commits.
+- Callers get a Future that resolves only after the group's COMMIT returns, so
+  a successful result always means the write is durable.
+- max_delay_ms trades latency for batch size: 0 commits whatever has queued up
+  while the previous commit was running (no added delay), larger values wait
+  for more company.
+- Threads only: the committer lives in one process. Writers in other processes
+  would have to forward their requests to it (e.g. over a multiprocessing queue);
+  that part is not covered here.
+
+Usage:
+    python sqlite/group_commit.py
+    python sqlite/group_commit.py --benchmark --threads 16 --writes 200
+"""
+from concurrent.futures import Future
+import argparse
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+DB = 'group_commit.db'
+
+
+class GroupCommitter:
+    """
+    Single-writer thread that commits queued operations in groups.
+
+    Example:
+        committer = GroupCommitter("app.db", max_delay_ms=2, max_batch=256)
+        future = committer.submit("INSERT INTO events (kind) VALUES (?);", ("login",))
+        future.result()  # returns the rowcount once the group has committed
+        committer.close()
+    """
+
+    def __init__(self, database, max_delay_ms=2.0, max_batch=256, synchronous="FULL"):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.max_delay = max_delay_ms / 1000
+        self.max_batch = max_batch
+        self.commits = 0
+        self.operations = 0
+        self._conn = sqlite3.connect(database, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL;")
+        self._conn.execute(f"PRAGMA synchronous = {synchronous};")
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-committer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params=()):
+        """Queue one statement; the Future resolves to its rowcount after COMMIT."""
+        return self.submit_job(lambda conn: conn.execute(sql, params).rowcount)
+
+    def submit_job(self, job):
+        """Queue job(conn), which may run several statements; they succeed or fail together."""
+        future = Future()
+        self._queue.put((future, job))
+        return future
+
+    def execute(self, sql, params=()):
+        return self.submit(sql, params).result()
+
+    def _collect(self):
+        """Block for the first operation, then gather more until the delay or size limit."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = self._conn
+        while True:
+            batch = self._collect()
+            stop = batch[-1] is None
+            operations = [item for item in batch if item is not None]
+            if operations:
+                self._commit_group(conn, operations)
+            if stop:
+                break
+
+    def _commit_group(self, conn, operations):
+        outcomes = []
+        running = [(future, job) for future, job in operations if future.set_running_or_notify_cancel()]
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            for future, job in running:
+                conn.execute("SAVEPOINT op;")
+                try:
+                    outcomes.append((future, job(conn), None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op;")
+                    outcomes.append((future, None, e))
+                conn.execute("RELEASE op;")
+            conn.execute("COMMIT;")
+        except BaseException as e:
+            # BEGIN, a savepoint step or COMMIT failed (or a job raised a BaseException):
+            # nothing in the group is durable, so every caller gets the error.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            for future, _ in running:
+                future.set_exception(e)
+            return
+        self.commits += 1
+        self.operations += len(outcomes)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def close(self):
+        """Commit everything still queued and stop the committer thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._conn.close()
+
+
+def setup_database(path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("""
+        CREATE TABLE events (
+            id      INTEGER PRIMARY KEY,
+            thread  INTEGER NOT NULL,
+            payload TEXT NOT NULL
+        );
+    """)
+    conn.commit()
+    conn.close()
+
+
+def demo():
+    setup_database(DB)
+    committer = GroupCommitter(DB, max_delay_ms=5)
+    futures = [
+        committer.submit("INSERT INTO events (id, thread, payload) VALUES (?, 0, ?);", (i, f"e{i}"))
+        for i in (1, 2, 2, 3)  # the second id 2 violates the primary key
+    ]
+    for future in futures:
+        try:
+            print(f"[Caller] rowcount={future.result()}")
+        except sqlite3.IntegrityError as e:
+            print(f"[Caller] error={e}")
+    committer.close()
+    conn = sqlite3.connect(DB)
+    ids = [row[0] for row in conn.execute("SELECT id FROM events ORDER BY id;")]
+    conn.close()
+    print(f"[Result] {committer.operations} operations in {committer.commits} commit(s); rows {ids}")
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def benchmark(threads, writes_per_thread, max_delay_ms, max_batch):
+    print(f"[Setup] {threads} threads x {writes_per_thread} writes, synchronous=FULL, "
+          f"{os.cpu_count()} CPU cores", flush=True)
+    sql = "INSERT INTO events (thread, payload) VALUES (?, ?);"
+
+    def run(write):
+        latencies = []
+        lock = threading.Lock()
+
+        def worker(n):
+            mine = []
+            for i in range(writes_per_thread):
+                started_at = time.perf_counter()
+                write(n, (n, f"payload-{n}-{i}"))
+                mine.append(time.perf_counter() - started_at)
+            with lock:
+                latencies.extend(mine)
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        started_at = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started_at
+        latencies.sort()
+        return elapsed, latencies
+
+    def report(label, elapsed, latencies, commits):
+        print(f"{label:<32} {len(latencies) / elapsed:>9,.0f} writes/s "
+              f"{commits / elapsed:>9,.0f} commits/s  "
+              f"p50 {percentile(latencies, 0.50) * 1000:7.2f} ms  "
+              f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, DB)
+
+        setup_database(path)
+        local = threading.local()
+
+        def transaction_per_write(n, params):
+            if not hasattr(local, "conn"):
+                local.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+                local.conn.execute("PRAGMA synchronous = FULL;")
+            local.conn.execute("BEGIN IMMEDIATE;")
+            local.conn.execute(sql, params)
+            local.conn.execute("COMMIT;")
+
+        elapsed, latencies = run(transaction_per_write)
+        report("transaction per write", elapsed, latencies, len(latencies))
+
+        for delay in sorted({0.0, max_delay_ms}):
+            setup_database(path)
+            committer = GroupCommitter(path, max_delay_ms=delay, max_batch=max_batch)
+            elapsed, latencies = run(lambda n, params: committer.execute(sql, params))
+            committer.close()
+            report(f"group commit ({delay:g} ms, {committer.operations / committer.commits:.0f}/commit)",
+                   elapsed, latencies, committer.commits)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Demo: group commit for many small SQLite writes")
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Compare commits/s and p99 latency with one transaction per write'
+    )
+    parser.add_argument('--threads', type=int, default=16, help='Writer threads')
+    parser.add_argument('--writes', type=int, default=200, help='Writes per thread')
+    parser.add_argument('--max-delay-ms', type=float, default=2.0, help='Longest wait for more writes')
+    parser.add_argument('--max-batch', type=int, default=256, help='Most writes per commit')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.threads, args.writes, args.max_delay_ms, args.max_batch)
+    else:
+        demo()
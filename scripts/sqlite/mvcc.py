@@ -15,12 +15,24 @@ Concept:
   still current. If another worker updated it first, the stale worker aborts.
 - SQLite still allows only one writer at a time, so the long "thinking" phase
   stays outside the write transaction to focus on MVCC conflict detection.
+- The index on (id, valid_to, valid_from) finds the visible version by seeking
+  to the versions still valid at the snapshot time. Old, expired versions sit
+  below that key range, so a read costs the same after a million updates.
+- Every transaction registers its snapshot in active_snapshots. The vacuum
+  deletes versions that expired before the oldest active snapshot, since no
+  running or future reader can see them. It works in small batches so the
+  write lock is never held for long.
 
 Usage:
     python sqlite/mvcc.py
+    python sqlite/mvcc.py --benchmark --updates 1000000
 """
+import argparse
 import os
+import random
 import sqlite3
+import statistics
+import threading
 import time
 import uuid
 from multiprocessing import Process
@@ -29,23 +41,46 @@ DB = "mvcc.db"
 TBL = "products_versioned"
 SENTINEL = 1e12  # "infinite" timestamp
 
-def setup():
-    if os.path.exists(DB):
-        os.remove(DB)
-    with sqlite3.connect(DB) as conn:
-        c = conn.cursor()
-        c.execute("PRAGMA journal_mode = WAL;")
+VISIBLE_VERSION_SQL = f"""
+    SELECT quantity, version_id
+    FROM {TBL}
+    WHERE id=? AND valid_from <= ? AND valid_to > ?
+    ORDER BY valid_from DESC LIMIT 1;
+"""
+
+def create_schema(c, indexed=True):
+    c.execute(f"""
+        CREATE TABLE {TBL} (
+            id           INTEGER,
+            name         TEXT,
+            quantity     INTEGER,
+            version_id   TEXT,
+            valid_from   REAL,
+            valid_to     REAL DEFAULT {SENTINEL},
+            PRIMARY KEY(id, version_id)
+        );
+    """)
+    c.execute("""
+        CREATE TABLE active_snapshots (
+            snapshot_id  TEXT PRIMARY KEY,
+            started_at   REAL NOT NULL
+        );
+    """)
+    if indexed:
+        c.execute(f"CREATE INDEX idx_{TBL}_visibility ON {TBL}(id, valid_to, valid_from);")
+        # Partial index: only expired versions, the ones the vacuum looks for.
         c.execute(f"""
-            CREATE TABLE {TBL} (
-                id           INTEGER,
-                name         TEXT,
-                quantity     INTEGER,
-                version_id   TEXT,
-                valid_from   REAL,
-                valid_to     REAL DEFAULT {SENTINEL},
-                PRIMARY KEY(id, version_id)
-            );
+            CREATE INDEX idx_{TBL}_expired ON {TBL}(valid_to)
+            WHERE valid_to < {SENTINEL};
         """)
+
+def setup(path=DB):
+    if os.path.exists(path):
+        os.remove(path)
+    with sqlite3.connect(path) as conn:
+        c = conn.cursor()
+        c.execute("PRAGMA journal_mode = WAL;")
+        create_schema(c)
         now = time.time()
         c.execute(f"""
             INSERT INTO {TBL}(id,name,quantity,version_id,valid_from)
@@ -53,35 +88,126 @@ def setup():
         """, (str(uuid.uuid4()), now))
         conn.commit()
 
+def register_snapshot(c):
+    """
+    Record a new snapshot as active and return (snapshot_id, timestamp).
+
+    The timestamp is taken after the write lock is held, so a vacuum (which reads
+    its horizon under the same lock) either sees the snapshot or finishes before it.
+    """
+    snapshot_id = str(uuid.uuid4())
+    c.execute("BEGIN IMMEDIATE;")
+    try:
+        start_ts = time.time()
+        c.execute("INSERT INTO active_snapshots VALUES(?, ?);", (snapshot_id, start_ts))
+        c.execute("COMMIT;")
+    except BaseException:
+        c.execute("ROLLBACK;")
+        raise
+    return snapshot_id, start_ts
+
+def release_snapshot(c, snapshot_id):
+    c.execute("DELETE FROM active_snapshots WHERE snapshot_id=?;", (snapshot_id,))
+
+def oldest_active_snapshot(c):
+    """Start time of the oldest running transaction, or now if there is none."""
+    oldest, = c.execute("SELECT min(started_at) FROM active_snapshots;").fetchone()
+    return oldest if oldest is not None else time.time()
+
+def vacuum_versions(conn, batch_size=1000, pause=0.0):
+    """
+    Delete versions that expired before the oldest active snapshot, batch by batch.
+
+    A version is visible at time t only if valid_to > t, so once valid_to is older
+    than every active snapshot no reader can see it again. conn must be in
+    autocommit mode (isolation_level=None). Returns the number of deleted versions.
+    """
+    deleted = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # Read the horizon under the write lock, so no snapshot can register in between.
+            horizon = oldest_active_snapshot(conn)
+            removed = conn.execute(f"""
+                DELETE FROM {TBL} WHERE rowid IN (
+                    SELECT rowid FROM {TBL}
+                    WHERE valid_to < {SENTINEL} AND valid_to <= ?
+                    LIMIT ?
+                );
+            """, (horizon, batch_size)).rowcount
+            conn.execute("COMMIT;")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            raise
+        deleted += removed
+        if removed < batch_size:
+            return deleted
+        time.sleep(pause)
+
+def start_background_vacuum(path=DB, interval=0.5, batch_size=1000):
+    """
+    Run vacuum_versions every interval seconds on its own thread and connection.
+
+    Returns (thread, stop_event); set the event and join the thread to stop it.
+    The thread's "deleted" attribute counts the versions it has removed.
+    """
+    stop = threading.Event()
+
+    def run():
+        # No busy timeout: SQLite's busy handler backs off for up to 100 ms at a
+        # time and would keep missing the short gaps between a busy writer's
+        # transactions. Polling every millisecond gets in.
+        conn = sqlite3.connect(path, isolation_level=None, timeout=0)
+        while not stop.is_set():
+            try:
+                thread.deleted += vacuum_versions(conn, batch_size)
+            except sqlite3.OperationalError:
+                stop.wait(0.001)
+                continue
+            stop.wait(interval)
+        conn.close()
+
+    thread = threading.Thread(target=run, name="mvcc-vacuum", daemon=True)
+    thread.deleted = 0
+    thread.start()
+    return thread, stop
+
 def transaction(label, delta, sleep_secs):
     conn = sqlite3.connect(DB, isolation_level=None, timeout=10)
     c = conn.cursor()
     c.execute("PRAGMA journal_mode = WAL;")
 
     # 1) read a snapshot of the current version
-    start_ts = time.time()
+    snapshot_id, start_ts = register_snapshot(c)
+    try:
+        _transaction(c, label, delta, sleep_secs, start_ts)
+    finally:
+        # A failed statement can leave _transaction's BEGIN IMMEDIATE open; the release
+        # must not be rolled back with it, or the snapshot pins the vacuum forever.
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        release_snapshot(c, snapshot_id)
+        conn.close()
+
+def _transaction(c, label, delta, sleep_secs, start_ts):
     print(f"[{label}] snapshot at {start_ts:.3f}")
 
     # 2) read the currently visible version
-    c.execute(f"""
-        SELECT quantity, version_id
-        FROM {TBL}
-        WHERE id=1 AND valid_from <= ? AND valid_to > ?
-        ORDER BY valid_from DESC LIMIT 1;
-    """, (start_ts, start_ts))
+    c.execute(VISIBLE_VERSION_SQL, (1, start_ts, start_ts))
     row = c.fetchone()
     if not row:
         print(f"[{label}] nothing to read!")
-        conn.close()
         return
     qty, vid = row
     print(f"[{label}] read qty={qty} vid={vid}")
 
     time.sleep(sleep_secs)  # simulate work outside the write transaction
 
-    # 3) attempt to expire the old version and insert a new one
-    now = time.time()
+    # 3) attempt to expire the old version and insert a new one; the timestamp is
+    #    taken under the write lock, so it is later than every registered snapshot
     c.execute("BEGIN IMMEDIATE;")
+    now = time.time()
     updated = c.execute(
         f"""
         UPDATE {TBL}
@@ -96,7 +222,6 @@ def transaction(label, delta, sleep_secs):
     if updated != 1:
         print(f"[{label}] ABORT: snapshot is stale")
         c.execute("ROLLBACK;")
-        conn.close()
         return
 
     new_qty = qty + delta
@@ -109,7 +234,6 @@ def transaction(label, delta, sleep_secs):
     )
     c.execute("COMMIT;")
     print(f"[{label}] COMMIT new_qty={new_qty}")
-    conn.close()
 
 def show_versions():
     with sqlite3.connect(DB) as conn:
@@ -119,13 +243,110 @@ def show_versions():
         """):
             print(row)
 
+def apply_updates(conn, current, count, batch_size=1000, pause=0.0):
+    """
+    Write count new versions spread over the ids in current ({id: (quantity, vid)}).
+
+    pause leaves a gap between write transactions, as a real workload has, so
+    the background vacuum can take the write lock.
+    """
+    ids = list(current)
+    rng = random.Random(count)
+    for start in range(0, count, batch_size):
+        conn.execute("BEGIN IMMEDIATE;")
+        for _ in range(min(batch_size, count - start)):
+            product_id = rng.choice(ids)
+            qty, vid = current[product_id]
+            now = time.time()
+            conn.execute(f"UPDATE {TBL} SET valid_to=? WHERE id=? AND version_id=? "
+                         f"AND valid_to={SENTINEL};", (now, product_id, vid))
+            new_vid = str(uuid.uuid4())
+            conn.execute(f"INSERT INTO {TBL}(id,name,quantity,version_id,valid_from) "
+                         "VALUES(?,'Widget',?,?,?);", (product_id, qty + 1, new_vid, now))
+            current[product_id] = (qty + 1, new_vid)
+        conn.execute("COMMIT;")
+        time.sleep(pause)
+
+def read_latency_ms(conn, ids, reads):
+    """Median latency of reading the visible version of a random id at the current time."""
+    rng = random.Random(0)
+    latencies = []
+    for _ in range(reads):
+        product_id = rng.choice(ids)
+        started_at = time.perf_counter()
+        ts = time.time()
+        row = conn.execute(VISIBLE_VERSION_SQL, (product_id, ts, ts)).fetchone()
+        latencies.append((time.perf_counter() - started_at) * 1000)
+        assert row is not None
+    return statistics.median(latencies)
+
+def benchmark(updates, products=100, reads=200):
+    checkpoints = [n for n in (1_000, 10_000, 100_000, 1_000_000, 10_000_000) if n < updates]
+    checkpoints.append(updates)
+    configs = {
+        "no index": {"indexed": False, "vacuum": False},
+        "index": {"indexed": True, "vacuum": False},
+        "index + vacuum": {"indexed": True, "vacuum": True},
+    }
+    print(f"[Setup] {products} products, reads measured after each checkpoint "
+          f"(median of {reads}; 20 without an index)", flush=True)
+
+    for name, config in configs.items():
+        path = f"mvcc_bench_{name.replace(' ', '').replace('+', '_')}.db"
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        create_schema(conn, config["indexed"])
+        now = time.time()
+        current = {i: (100, str(uuid.uuid4())) for i in range(1, products + 1)}
+        conn.executemany(
+            f"INSERT INTO {TBL}(id,name,quantity,version_id,valid_from) VALUES(?,'Widget',?,?,?);",
+            ((i, qty, vid, now) for i, (qty, vid) in current.items()),
+        )
+
+        vacuum = start_background_vacuum(path, interval=0.2) if config["vacuum"] else None
+        done = 0
+        for checkpoint in checkpoints:
+            apply_updates(conn, current, checkpoint - done, pause=0.002)
+            done = checkpoint
+            versions, = conn.execute(f"SELECT count(*) FROM {TBL};").fetchone()
+            latency = read_latency_ms(conn, list(current), reads if config["indexed"] else 20)
+            print(f"  {name:<15} {checkpoint:>10,} updates  {versions:>10,} versions stored  "
+                  f"read {latency:8.3f} ms", flush=True)
+        if vacuum is not None:
+            thread, stop = vacuum
+            stop.set()
+            thread.join()
+        conn.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
 if __name__ == "__main__":
-    setup()
-    # two processes, they’ll run concurrently
-    pA = Process(target=transaction, args=("A", +50, 2))
-    pB = Process(target=transaction, args=("B", -30, 1))
-    pA.start(); pB.start()
-    pA.join();  pB.join()
-
-    print("\nAll versions:")
-    show_versions()
+    parser = argparse.ArgumentParser(description="Demo: MVCC-style row versioning in SQLite")
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Show visible-version read latency as the number of updates grows'
+    )
+    parser.add_argument('--updates', type=int, default=1_000_000, help='Updates in the benchmark')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.updates)
+    else:
+        setup()
+        # two processes, they’ll run concurrently
+        pA = Process(target=transaction, args=("A", +50, 2))
+        pB = Process(target=transaction, args=("B", -30, 1))
+        pA.start(); pB.start()
+        pA.join();  pB.join()
+
+        print("\nAll versions:")
+        show_versions()
+
+        with sqlite3.connect(DB, isolation_level=None) as conn:
+            removed = vacuum_versions(conn)
+        print(f"\n[Vacuum] removed {removed} version(s) older than the oldest active snapshot:")
+        show_versions()
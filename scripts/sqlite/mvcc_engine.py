@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+In-Memory MVCC Engine
+
+Goal: Implement the versioning idea behind mvcc.py's products_versioned table
+      as an in-process key-value store, so that a visibility check is a
+      pointer walk instead of a SQL query.
+
+Concept:
+- Every key points at a chain of versions, newest first. A version holds the
+  value, the logical commit timestamp that created it, and a link to the
+  next-older version. The records use __slots__, so a version costs a few
+  dozen bytes instead of a dict per object.
+- Snapshot isolation: a transaction takes the current commit timestamp when it
+  begins. It sees the newest version committed at or before that timestamp,
+  plus its own uncommitted writes.
+- First committer wins: at commit time, if any key in the write set has a
+  version newer than the snapshot, another transaction got there first and the
+  commit fails with WriteConflict. This is the same check as mvcc.py's
+  "UPDATE ... WHERE valid_to = SENTINEL", done in memory.
+- Epoch-based garbage collection: each active transaction pins the epoch
+  (commit timestamp) it started in. Versions superseded before the oldest
+  pinned epoch can never be read again, so gc() unlinks them. Only keys
+  written since the last pass are visited.
+
+Usage:
+    python sqlite/mvcc_engine.py
+    python sqlite/mvcc_engine.py --benchmark --threads 4 --transactions 2000
+"""
+from collections import Counter
+from contextlib import redirect_stdout
+import argparse
+import io
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import mvcc
+
+TOMBSTONE = object()
+
+
+class WriteConflict(Exception):
+    """Another transaction committed a newer version of a key in the write set."""
+
+
+class Version:
+    __slots__ = ("value", "commit_ts", "older")
+
+    def __init__(self, value, commit_ts, older):
+        self.value = value
+        self.commit_ts = commit_ts
+        self.older = older
+
+
+class MVCCEngine:
+    """
+    Thread-safe in-memory key-value store with snapshot isolation.
+
+    Example:
+        engine = MVCCEngine()
+        with engine.begin() as tx:
+            tx.put(1, ("Widget", 100))
+        with engine.begin() as tx:
+            name, quantity = tx.get(1)
+            tx.put(1, (name, quantity + 50))
+    """
+
+    def __init__(self, gc_every=1024):
+        self.gc_every = gc_every
+        self._heads = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+        self._active_epochs = Counter()
+        self._dirty = set()
+        self._commits_since_gc = 0
+        self.stats = Counter()
+
+    def begin(self):
+        with self._lock:
+            start_ts = self._clock
+            self._active_epochs[start_ts] += 1
+        return Transaction(self, start_ts)
+
+    def _release(self, start_ts):
+        with self._lock:
+            self._active_epochs[start_ts] -= 1
+            if not self._active_epochs[start_ts]:
+                del self._active_epochs[start_ts]
+
+    def read(self, key, ts):
+        """Newest value of key committed at or before ts (None if absent or deleted)."""
+        version = self._heads.get(key)
+        while version is not None and version.commit_ts > ts:
+            version = version.older
+        if version is None or version.value is TOMBSTONE:
+            return None
+        return version.value
+
+    def _commit(self, start_ts, writes):
+        with self._lock:
+            for key in writes:
+                head = self._heads.get(key)
+                if head is not None and head.commit_ts > start_ts:
+                    self.stats["conflicts"] += 1
+                    raise WriteConflict(f"key {key!r} was committed after snapshot {start_ts}")
+            commit_ts = self._clock + 1
+            for key, value in writes.items():
+                self._heads[key] = Version(value, commit_ts, self._heads.get(key))
+            # Publish the new timestamp last, so a snapshot taken now sees all or none of it.
+            self._clock = commit_ts
+            self._dirty.update(writes)
+            self.stats["commits"] += 1
+            self._commits_since_gc += 1
+            run_gc = self.gc_every and self._commits_since_gc >= self.gc_every
+        if run_gc:
+            self.gc()
+        return commit_ts
+
+    def gc(self):
+        """
+        Unlink versions that no active or future snapshot can read.
+
+        Returns the number of versions dropped.
+        """
+        with self._lock:
+            horizon = min(self._active_epochs) if self._active_epochs else self._clock
+            dirty, self._dirty = self._dirty, set()
+            self._commits_since_gc = 0
+        dropped = 0
+        still_dirty = set()
+        for key in dirty:
+            version = self._heads.get(key)
+            # Find the newest version visible at the horizon; everything older is garbage.
+            while version is not None and version.commit_ts > horizon:
+                version = version.older
+            if version is None:
+                still_dirty.add(key)
+                continue
+            older, version.older = version.older, None
+            while older is not None:
+                dropped += 1
+                older = older.older
+            if version.value is TOMBSTONE and version is self._heads.get(key):
+                with self._lock:
+                    if self._heads.get(key) is version:
+                        del self._heads[key]
+            elif version is not self._heads.get(key):
+                still_dirty.add(key)  # newer versions above the horizon may become garbage later
+        with self._lock:
+            self._dirty |= still_dirty
+            self.stats["gc_dropped"] += dropped
+        return dropped
+
+    def chain_length(self, key):
+        length, version = 0, self._heads.get(key)
+        while version is not None:
+            length, version = length + 1, version.older
+        return length
+
+
+class Transaction:
+    __slots__ = ("engine", "start_ts", "writes", "done")
+
+    def __init__(self, engine, start_ts):
+        self.engine = engine
+        self.start_ts = start_ts
+        self.writes = {}
+        self.done = False
+
+    def get(self, key):
+        if key in self.writes:
+            value = self.writes[key]
+            return None if value is TOMBSTONE else value
+        return self.engine.read(key, self.start_ts)
+
+    def put(self, key, value):
+        self.writes[key] = value
+
+    def delete(self, key):
+        self.writes[key] = TOMBSTONE
+
+    def commit(self):
+        """Install the writes; raises WriteConflict if a newer version was committed first."""
+        try:
+            if self.writes:
+                return self.engine._commit(self.start_ts, self.writes)
+            return self.start_ts
+        finally:
+            self._finish()
+
+    def abort(self):
+        self._finish()
+
+    def _finish(self):
+        if not self.done:
+            self.done = True
+            self.engine._release(self.start_ts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+def transaction(engine, label, delta, think_secs=0.0):
+    """In-memory counterpart of mvcc.transaction: read, think, write, commit or abort."""
+    tx = engine.begin()
+    name, quantity = tx.get(1)
+    print(f"[{label}] snapshot at ts={tx.start_ts}, read qty={quantity}")
+    time.sleep(think_secs)
+    tx.put(1, (name, quantity + delta))
+    try:
+        commit_ts = tx.commit()
+        print(f"[{label}] COMMIT new_qty={quantity + delta} at ts={commit_ts}")
+        return True
+    except WriteConflict:
+        print(f"[{label}] ABORT: snapshot is stale")
+        return False
+
+
+def demo():
+    engine = MVCCEngine()
+    with engine.begin() as tx:
+        tx.put(1, ("Widget", 100))
+
+    a = threading.Thread(target=transaction, args=(engine, "A", +50, 0.2))
+    b = threading.Thread(target=transaction, args=(engine, "B", -30, 0.1))
+    a.start(); b.start()
+    a.join(); b.join()
+
+    reader = engine.begin()  # a long-running snapshot pins the versions it can see
+    for _ in range(1000):
+        with engine.begin() as tx:
+            name, quantity = tx.get(1)
+            tx.put(1, (name, quantity + 1))
+    print(f"\n[GC] chain length with an old snapshot open: {engine.chain_length(1)}")
+    engine.gc()
+    print(f"[GC] after gc(), still pinned by the snapshot:  {engine.chain_length(1)} "
+          f"(it still reads qty={reader.get(1)[1]})")
+    reader.commit()
+    engine.gc()
+    print(f"[GC] after the snapshot ends and gc() runs:     {engine.chain_length(1)}")
+    with engine.begin() as tx:
+        print(f"[Result] qty={tx.get(1)[1]}, stats={dict(engine.stats)}")
+
+
+def run_threads(threads, transactions_per_thread, attempt):
+    """Run attempt(thread, i) -> bool from several threads; return (seconds, commits, aborts)."""
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def worker(n):
+        mine = Counter()
+        for i in range(transactions_per_thread):
+            mine["commits" if attempt(n, i) else "aborts"] += 1
+        with lock:
+            outcomes.update(mine)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started_at = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - started_at, outcomes["commits"], outcomes["aborts"]
+
+
+def benchmark(threads, transactions_per_thread, products):
+    total = threads * transactions_per_thread
+    print(f"[Setup] {threads} threads x {transactions_per_thread} read-modify-write transactions, "
+          f"{os.cpu_count()} CPU cores", flush=True)
+
+    def report(label, seconds, commits, aborts):
+        print(f"  {label:<34} {total / seconds:>10,.0f} tx/s  "
+              f"{commits / seconds:>10,.0f} commits/s  aborts {aborts:>6,}")
+
+    # SQLite-backed path: mvcc.transaction() on product 1, with its prints silenced.
+    # It does not report whether it committed, so commits are counted from the
+    # version rows it left behind.
+    mvcc.setup()
+    with redirect_stdout(io.StringIO()):
+        seconds, _, _ = run_threads(threads, transactions_per_thread,
+                                    lambda n, i: mvcc.transaction(f"T{n}", 1, 0) or True)
+    conn = sqlite3.connect(mvcc.DB)
+    committed = conn.execute(f"SELECT count(*) FROM {mvcc.TBL};").fetchone()[0] - 1
+    conn.close()
+    report("SQLite mvcc.transaction()", seconds, committed, total - committed)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(mvcc.DB + suffix):
+            os.remove(mvcc.DB + suffix)
+
+    # In-memory engine, same contention on a single product, then spread over many.
+    for label, keys in (("MVCCEngine (1 product)", 1), (f"MVCCEngine ({products} products)", products)):
+        engine = MVCCEngine()
+        with engine.begin() as tx:
+            for key in range(1, keys + 1):
+                tx.put(key, ("Widget", 100))
+        rngs = [random.Random(n) for n in range(threads)]
+
+        def attempt(n, i):
+            key = rngs[n].randint(1, keys)
+            tx = engine.begin()
+            name, quantity = tx.get(key)
+            tx.put(key, (name, quantity + 1))
+            try:
+                tx.commit()
+                return True
+            except WriteConflict:
+                return False
+
+        seconds, commits, aborts = run_threads(threads, transactions_per_thread, attempt)
+        report(label, seconds, commits, aborts)
+        longest = max(engine.chain_length(key) for key in range(1, keys + 1))
+        engine.gc()
+        print(f"  {'':<34} longest version chain {longest:,}, "
+              f"{max(engine.chain_length(key) for key in range(1, keys + 1))} after a final gc(); "
+              f"{engine.stats['gc_dropped']:,} versions collected")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Demo: in-memory MVCC key-value engine")
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Compare multi-threaded transactions/s with the SQLite-backed mvcc.transaction()'
+    )
+    parser.add_argument('--threads', type=int, default=4, help='Worker threads')
+    parser.add_argument('--transactions', type=int, default=2000, help='Transactions per thread')
+    parser.add_argument('--products', type=int, default=1000, help='Keys in the spread-out run')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.threads, args.transactions, args.products)
+    else:
+        demo()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Time-Partitioned Tables with Partition Pruning
+
+Goal: Split the mock example_table by time into per-day or per-month
+      partitions, query only the partitions a time range touches, and retire
+      old partitions by dropping or archiving them instead of DELETEing rows.
+
+Concept:
+- SQLite has no native partitioning, so a partition is either a table
+  (example_table_p20240101 in the main file) or a separate database file that is
+  ATTACHed on demand (storage="files").
+- Timestamps are integer microseconds since 1970 (the "epoch" layout of
+  create_mock_db.py), so routing a row is integer arithmetic.
+- The router prunes partitions whose time bounds miss the queried range. A
+  partition that lies fully inside the range is read without a WHERE clause.
+- Retiring a month of data is a DROP TABLE or moving a file, not a DELETE
+  that rewrites index pages and leaves free pages behind.
+- SQLite limits how many files can be attached at once (10 by default), so
+  file partitions are attached lazily and the least recently used one is
+  detached when the limit is reached.
+
+Usage:
+    python sqlite/partitioning.py
+    python sqlite/partitioning.py --benchmark
+    python sqlite/partitioning.py --benchmark --rows 100000000 --days 365 --granularity month
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import argparse
+import glob
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from create_mock_db import PRAGMA_PROFILES, apply_pragma_profile, from_epoch_us, to_epoch_us
+
+US_PER_DAY = 86_400 * 1_000_000
+# SQLite's default SQLITE_MAX_ATTACHED, used where Connection.getlimit is missing.
+SQLITE_MAX_ATTACHED = 10
+KEY_FORMATS = {"day": "%Y%m%d", "month": "%Y%m"}
+PARTITION_DDL = """CREATE TABLE IF NOT EXISTS {table} (
+                       id integer PRIMARY KEY,
+                       timestamp integer NOT NULL
+                   );
+                   CREATE INDEX IF NOT EXISTS {index} ON {table_only}(timestamp);"""
+
+
+def partition_key(granularity, timestamp_us):
+    """Partition key ('20240131' or '202401') of a microsecond timestamp."""
+    return from_epoch_us(timestamp_us).strftime(KEY_FORMATS[granularity])
+
+
+def partition_bounds(granularity, key):
+    """[start_us, end_us) covered by a partition."""
+    start = datetime.strptime(key, KEY_FORMATS[granularity])
+    if granularity == "day":
+        end = start + timedelta(days=1)
+    else:
+        end = (start + timedelta(days=32)).replace(day=1)
+    return to_epoch_us(start), to_epoch_us(end)
+
+
+class PartitionManager:
+    """
+    Route example_table rows into time partitions and query them with pruning.
+
+    Example:
+        manager = PartitionManager(conn, granularity="day")
+        manager.insert_rows([(1, to_epoch_us(datetime(2024, 1, 1, 12)))])
+        rows = manager.query(datetime(2024, 1, 1), datetime(2024, 1, 2))
+        manager.archive(manager.partitions()[0], "archive/")
+    """
+
+    def __init__(self, conn, granularity="day", storage="tables", directory="."):
+        if granularity not in KEY_FORMATS:
+            raise ValueError(f"Unknown granularity {granularity!r}; choose from {sorted(KEY_FORMATS)}")
+        if storage not in ("tables", "files"):
+            raise ValueError(f"Unknown storage {storage!r}; choose 'tables' or 'files'")
+        self.conn = conn
+        self.granularity = granularity
+        self.storage = storage
+        self.directory = directory
+        self._attached = OrderedDict()
+        self._bounds = {}
+        getlimit = getattr(conn, "getlimit", None)  # Python 3.11+
+        self._max_attached = (
+            getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if getlimit is not None else SQLITE_MAX_ATTACHED
+        )
+        self._known = set(self._discover())
+
+    # --- partition naming and bounds ---------------------------------------
+
+    def key_for(self, timestamp_us):
+        return partition_key(self.granularity, timestamp_us)
+
+    def bounds(self, key):
+        # Cached: prune() checks the bounds of every partition on each query.
+        if key not in self._bounds:
+            self._bounds[key] = partition_bounds(self.granularity, key)
+        return self._bounds[key]
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"example_table_p{key}.db")
+
+    def _discover(self):
+        if self.storage == "files":
+            paths = glob.glob(os.path.join(self.directory, "example_table_p*.db"))
+            return [os.path.basename(path)[len("example_table_p"):-3] for path in paths]
+        rows = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'example_table_p%'"
+        ).fetchall()
+        return [name[len("example_table_p"):] for name, in rows]
+
+    def partitions(self):
+        """All partition keys, oldest first."""
+        return sorted(self._known)
+
+    def table(self, key, create=False):
+        """Qualified table name of a partition, attaching its file if needed."""
+        if key not in self._known and not create:
+            raise ValueError(f"No partition {key!r}")
+        if self.storage == "tables":
+            table = f"example_table_p{key}"
+            if key not in self._known:
+                self.conn.executescript(PARTITION_DDL.format(
+                    table=table, table_only=table, index=f"idx_{table}_timestamp"))
+        else:
+            schema = self._attach(key)
+            table = f"{schema}.example_table"
+            if key not in self._known:
+                self.conn.executescript(PARTITION_DDL.format(
+                    table=table, table_only="example_table",
+                    index=f"{schema}.idx_example_table_timestamp"))
+        self._known.add(key)
+        return table
+
+    def _attach(self, key):
+        schema = f"p{key}"
+        if key in self._attached:
+            self._attached.move_to_end(key)
+            return schema
+        # ATTACH and DETACH are not allowed inside a transaction.
+        self.conn.commit()
+        if len(self._attached) >= self._max_attached:
+            oldest, _ = self._attached.popitem(last=False)
+            self.conn.execute(f"DETACH DATABASE p{oldest}")
+        self.conn.execute(f"ATTACH DATABASE ? AS {schema}", (self._path(key),))
+        self._attached[key] = schema
+        return schema
+
+    def _detach(self, key):
+        if self._attached.pop(key, None) is not None:
+            self.conn.commit()
+            self.conn.execute(f"DETACH DATABASE p{key}")
+
+    # --- writing -----------------------------------------------------------
+
+    def insert_rows(self, rows, batch_size=10_000):
+        """
+        Insert (id, timestamp_us) rows, each into the partition its timestamp falls in.
+
+        Rows arriving in time order only cross a partition boundary occasionally,
+        so the current partition's bounds are cached and checked with two compares.
+        """
+        low = high = None
+        table = None
+        batch = []
+
+        def flush():
+            if batch:
+                self.conn.executemany(
+                    f"INSERT INTO {table}(id, timestamp) VALUES(?, ?)", batch
+                )
+                batch.clear()
+
+        for row in rows:
+            timestamp_us = row[1]
+            if low is None or not low <= timestamp_us < high:
+                flush()
+                key = self.key_for(timestamp_us)
+                low, high = self.bounds(key)
+                table = self.table(key, create=True)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        self.conn.commit()
+
+    # --- reading -----------------------------------------------------------
+
+    def prune(self, start, end):
+        """Keys of the partitions that overlap [start, end), oldest first."""
+        start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+        keys = []
+        for key in self.partitions():
+            low, high = self.bounds(key)
+            if low < end_us and start_us < high:
+                keys.append(key)
+        return keys
+
+    def _partition_queries(self, select, start, end):
+        start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+        for key in self.prune(start, end):
+            low, high = self.bounds(key)
+            table = self.table(key)
+            if start_us <= low and high <= end_us:
+                yield f"SELECT {select} FROM {table}", ()
+            else:
+                yield (f"SELECT {select} FROM {table} WHERE timestamp >= ? AND timestamp < ?",
+                       (start_us, end_us))
+
+    def query(self, start, end, columns="id, timestamp"):
+        """Rows in [start, end), ordered by timestamp, read only from the pruned partitions."""
+        rows = []
+        for sql, params in self._partition_queries(columns, start, end):
+            rows += self.conn.execute(f"{sql} ORDER BY timestamp", params).fetchall()
+        return rows
+
+    def count(self, start, end):
+        """Number of rows in [start, end)."""
+        return sum(
+            self.conn.execute(sql, params).fetchone()[0]
+            for sql, params in self._partition_queries("count(*)", start, end)
+        )
+
+    # --- retiring old data -------------------------------------------------
+
+    def drop(self, key):
+        """Delete a partition and all of its rows."""
+        if self.storage == "tables":
+            self.conn.execute(f"DROP TABLE example_table_p{key}")
+            self.conn.commit()
+        else:
+            self._detach(key)
+            os.remove(self._path(key))
+        self._known.discard(key)
+
+    def archive(self, key, archive_dir):
+        """
+        Move a partition out of the live database into archive_dir/example_table_p<key>.db.
+
+        The archived file is a standalone SQLite database with one example_table.
+        Returns the path of the archived file.
+        """
+        os.makedirs(archive_dir, exist_ok=True)
+        target = os.path.join(archive_dir, f"example_table_p{key}.db")
+        if self.storage == "files":
+            self._detach(key)
+            shutil.move(self._path(key), target)
+        else:
+            self.conn.commit()
+            self.conn.execute("ATTACH DATABASE ? AS archive", (target,))
+            self.conn.executescript(PARTITION_DDL.format(
+                table="archive.example_table", table_only="example_table",
+                index="archive.idx_example_table_timestamp"))
+            self.conn.execute(
+                f"INSERT INTO archive.example_table SELECT id, timestamp "
+                f"FROM example_table_p{key} ORDER BY id"
+            )
+            self.conn.execute(f"DROP TABLE example_table_p{key}")
+            self.conn.commit()
+            self.conn.execute("DETACH DATABASE archive")
+        self._known.discard(key)
+        return target
+
+
+def mock_rows(num_rows, base, span_days):
+    """(id, timestamp_us) rows spread evenly over span_days starting at base."""
+    base_us = to_epoch_us(base)
+    spacing = max(1, span_days * US_PER_DAY // num_rows)
+    return ((i + 1, base_us + i * spacing) for i in range(num_rows))
+
+
+def load_single(conn, rows):
+    """Baseline: everything in one table with a range index built after the load."""
+    conn.execute("""CREATE TABLE example_table (
+                        id integer PRIMARY KEY,
+                        timestamp integer NOT NULL
+                    );""")
+    conn.executemany("INSERT INTO example_table(id, timestamp) VALUES(?, ?)", rows)
+    conn.execute("CREATE INDEX idx_example_table_timestamp ON example_table(timestamp);")
+    conn.commit()
+
+
+def median_ms(func, args_list):
+    latencies = []
+    for args in args_list:
+        started_at = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2]
+
+
+def benchmark(num_rows, days, granularity, queries, profile):
+    base = datetime(2024, 1, 1)
+    rng = random.Random(0)
+    windows = {"1 hour": timedelta(hours=1), "1 day": timedelta(days=1)}
+    ranges = {
+        label: [
+            (start, start + width)
+            for start in (
+                base + timedelta(seconds=rng.randrange(days * 86_400 - int(width.total_seconds())))
+                for _ in range(queries)
+            )
+        ]
+        for label, width in windows.items()
+    }
+    print(f"[Setup] {num_rows:,} rows over {days} days, {granularity} partitions, "
+          f"{queries} queries per window", flush=True)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        single = sqlite3.connect(os.path.join(tmp_dir, "single.db"))
+        apply_pragma_profile(single, profile)
+        started_at = time.perf_counter()
+        load_single(single, mock_rows(num_rows, base, days))
+        load_secs = time.perf_counter() - started_at
+
+        def single_query(start, end):
+            return single.execute(
+                "SELECT id, timestamp FROM example_table "
+                "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                (to_epoch_us(start), to_epoch_us(end))).fetchall()
+
+        def single_count(start, end):
+            return single.execute(
+                "SELECT count(*) FROM example_table WHERE timestamp >= ? AND timestamp < ?",
+                (to_epoch_us(start), to_epoch_us(end))).fetchone()[0]
+
+        _, oldest_end_us = partition_bounds(granularity, partition_key(granularity, to_epoch_us(base)))
+        results["single table"] = {
+            "load": load_secs,
+            **{label: median_ms(single_query, ranges[label]) for label in windows},
+            "count 1 day": median_ms(single_count, ranges["1 day"]),
+        }
+        started_at = time.perf_counter()
+        single.execute("DELETE FROM example_table WHERE timestamp < ?", (oldest_end_us,))
+        single.commit()
+        results["single table"]["retire oldest"] = time.perf_counter() - started_at
+        single.close()
+
+        for storage in ("tables", "files"):
+            directory = os.path.join(tmp_dir, storage)
+            os.makedirs(directory)
+            conn = sqlite3.connect(os.path.join(directory, "main.db"))
+            apply_pragma_profile(conn, profile)
+            manager = PartitionManager(conn, granularity, storage, directory)
+            started_at = time.perf_counter()
+            manager.insert_rows(mock_rows(num_rows, base, days))
+            load_secs = time.perf_counter() - started_at
+
+            for start, end in ranges["1 day"][:3]:
+                assert manager.query(start, end) == expected_rows(start, end, base, num_rows, days)
+            results[f"partitioned {storage}"] = {
+                "load": load_secs,
+                **{label: median_ms(manager.query, ranges[label]) for label in windows},
+                "count 1 day": median_ms(manager.count, ranges["1 day"]),
+            }
+            started_at = time.perf_counter()
+            manager.drop(manager.partitions()[0])
+            results[f"partitioned {storage}"]["retire oldest"] = time.perf_counter() - started_at
+            conn.close()
+
+    print(f"\n{'layout':<20} {'load':>8} {'1 hour':>10} {'1 day':>10} "
+          f"{'count 1 day':>12} {'retire oldest':>14}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['load']:>7.2f}s {r['1 hour']:>7.3f} ms {r['1 day']:>7.3f} ms "
+              f"{r['count 1 day']:>9.3f} ms {r['retire oldest'] * 1000:>11.1f} ms")
+
+
+def expected_rows(start, end, base, num_rows, days):
+    """Expected rows of a range, computed from the generator instead of a database."""
+    start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+    base_us = to_epoch_us(base)
+    spacing = max(1, days * US_PER_DAY // num_rows)
+    first = max(0, -(-(start_us - base_us) // spacing))
+    last = min(num_rows, -(-(end_us - base_us) // spacing))
+    return [(i + 1, base_us + i * spacing) for i in range(first, last)]
+
+
+def demo():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = sqlite3.connect(os.path.join(tmp_dir, "main.db"))
+        manager = PartitionManager(conn, granularity="day")
+        manager.insert_rows(mock_rows(10_000, datetime(2024, 1, 1), 5))
+        print(f"[Partitions] {manager.partitions()}")
+
+        start, end = datetime(2024, 1, 2, 18), datetime(2024, 1, 4)
+        print(f"[Router] {start} .. {end} touches {manager.prune(start, end)}")
+        for sql, params in manager._partition_queries("count(*)", start, end):
+            print(f"[Router]   {sql} {params or ''}")
+        print(f"[Router] {manager.count(start, end):,} rows in range")
+
+        archived = manager.archive("20240101", os.path.join(tmp_dir, "archive"))
+        rows, = sqlite3.connect(archived).execute("SELECT count(*) FROM example_table").fetchone()
+        print(f"[Archive] Moved 20240101 ({rows:,} rows) to {os.path.basename(archived)}; "
+              f"remaining {manager.partitions()}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Demo: time-partitioned tables with pruning")
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Compare range queries and retiring old data against a single table'
+    )
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows in the benchmark')
+    parser.add_argument('--days', type=int, default=90, help='Days the rows are spread over')
+    parser.add_argument('--granularity', choices=sorted(KEY_FORMATS), default='day')
+    parser.add_argument('--queries', type=int, default=50, help='Queries per window width')
+    parser.add_argument(
+        '--pragma-profile', choices=sorted(PRAGMA_PROFILES), default='bulk_load',
+        help='PRAGMA settings for the benchmark databases'
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows, args.days, args.granularity, args.queries, args.pragma_profile)
+    else:
+        demo()
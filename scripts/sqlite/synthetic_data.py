@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Spec-Driven Synthetic Data Generator
+
+Goal: Fill SQLite test tables of any size with realistic, skewed and
+      reproducible data described by a small schema spec.
+
+Concept:
+- Each column in the spec names a distribution:
+    uniform      integers (or reals) between min and max
+    normal       gaussian with mean/stddev, clamped to optional min/max
+    categorical  weighted choice from a fixed set of values
+    zipf         ranks 1..n with P(k) ~ 1/k^s, drawn by rejection-inversion in O(1) memory
+    foreign_key  ids of an earlier table; uniform, or zipf-skewed with "skew"
+  Foreign keys with skew give the "few customers place most orders" shape
+  that real tables have and that uniform data hides.
+- A skewed foreign key can also be correlated with an earlier column of the
+  same row ("correlate_with"): every value of that column gets its own
+  favourite parents, so each customer keeps ordering the same few products
+  instead of following one global popularity ranking.
+- Every column gets its own random.Random seeded from (seed, table, column),
+  so a run is reproducible and adding a column does not change the others.
+- Rows are generated column by column, one batch at a time, and streamed into
+  executemany, so memory stays bounded by the batch size, not the row count.
+- Loads run under a bulk-load PRAGMA profile from create_mock_db.py (no journal,
+  no fsyncs), and secondary indexes are built only after the data is in,
+  which is far cheaper than maintaining them row by row.
+
+Usage:
+    python sqlite/synthetic_data.py
+    python sqlite/synthetic_data.py --scale 100 --seed 7
+    python sqlite/synthetic_data.py --spec my_spec.json --database big.db
+"""
+from itertools import accumulate
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import time
+
+from create_mock_db import PRAGMA_PROFILES, apply_pragma_profile
+
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+COLUMN_TYPES = {"INTEGER", "REAL", "TEXT", "BLOB"}
+
+DB = 'synthetic.db'
+
+DEMO_SPEC = {
+    "tables": [
+        {
+            "name": "customers",
+            "rows": 10_000,
+            "columns": [
+                {"name": "country", "type": "TEXT", "distribution": "categorical",
+                 "values": {"US": 40, "DE": 15, "GB": 12, "FR": 10, "PL": 8, "JP": 8, "BR": 7}},
+                {"name": "age", "type": "INTEGER", "distribution": "normal",
+                 "mean": 38, "stddev": 12, "min": 18, "max": 90},
+                {"name": "signup_day", "type": "INTEGER", "distribution": "uniform",
+                 "min": 0, "max": 3650},
+            ],
+            "indexes": [["country"]],
+        },
+        {
+            "name": "products",
+            "rows": 2_000,
+            "columns": [
+                {"name": "price", "type": "REAL", "distribution": "normal",
+                 "mean": 40.0, "stddev": 25.0, "min": 1.0},
+                {"name": "popularity_rank", "type": "INTEGER", "distribution": "zipf",
+                 "n": 100, "s": 1.2},
+            ],
+            "indexes": [],
+        },
+        {
+            "name": "orders",
+            "rows": 100_000,
+            "columns": [
+                {"name": "customer_id", "distribution": "foreign_key",
+                 "references": "customers", "skew": 1.1},
+                {"name": "product_id", "distribution": "foreign_key",
+                 "references": "products", "skew": 1.5, "correlate_with": "customer_id"},
+                {"name": "quantity", "type": "INTEGER", "distribution": "zipf", "n": 20, "s": 2.0},
+                {"name": "status", "type": "TEXT", "distribution": "categorical",
+                 "values": {"delivered": 90, "shipped": 6, "cancelled": 3, "returned": 1}},
+            ],
+            "indexes": [["customer_id"], ["product_id"], ["status"]],
+        },
+    ]
+}
+
+
+def _log1p_over_x(x):
+    return math.log1p(x) / x if abs(x) > 1e-8 else 1 - x * (0.5 - x * (1 / 3 - 0.25 * x))
+
+
+def _expm1_over_x(x):
+    return math.expm1(x) / x if abs(x) > 1e-8 else 1 + x * 0.5 * (1 + x / 3 * (1 + 0.25 * x))
+
+
+def zipf_sampler(rng, n, s):
+    """
+    Return draw() -> rank in 1..n with P(k) ~ 1/k^s, in constant memory.
+
+    Rejection-inversion (Hoermann and Derflinger, 1996): invert the integral of
+    the continuous hat function x^-s and accept the rounded rank if it falls
+    under the discrete weight. No table of n weights is built, so a skewed
+    foreign key into a billion-row parent costs the same as one into ten rows.
+    """
+    if n < 1:
+        raise ValueError("zipf needs n >= 1")
+    if s < 0:
+        raise ValueError("zipf needs s >= 0")
+    if s == 0:
+        randint = rng.randint
+        return lambda: randint(1, n)
+
+    def h(x):
+        return math.exp(-s * math.log(x))
+
+    def h_integral(x):
+        log_x = math.log(x)
+        return _expm1_over_x((1 - s) * log_x) * log_x
+
+    def h_integral_inverse(x):
+        t = max(-1.0, x * (1 - s))
+        return math.exp(_log1p_over_x(t) * x)
+
+    h_integral_x1 = h_integral(1.5) - 1
+    h_integral_n = h_integral(n + 0.5)
+    squeeze = 2 - h_integral_inverse(h_integral(2.5) - h(2))
+    draw = rng.random
+
+    def sample():
+        while True:
+            u = h_integral_n + draw() * (h_integral_x1 - h_integral_n)
+            x = h_integral_inverse(u)
+            k = min(n, max(1, int(x + 0.5)))
+            if k - x <= squeeze or u >= h_integral(k + 0.5) - h(k):
+                return k
+
+    return sample
+
+
+def make_sampler(table, column, seed, row_counts):
+    """
+    Build a function that returns a list of k values for one column.
+
+    Args:
+        table (str): Table name, part of the column's seed
+        column (dict): Column spec
+        seed (int): Global seed
+        row_counts (dict): Row count of every table defined so far (for foreign keys)
+
+    Returns:
+        callable: sample(k, batch) -> list of k values, where batch maps the
+                  earlier columns of the same k rows to their values
+    """
+    rng = random.Random(f"{seed}:{table}:{column['name']}")
+    kind = column.get("distribution")
+    is_integer = column.get("type", "INTEGER").upper() == "INTEGER"
+
+    if kind == "uniform":
+        low, high = column["min"], column["max"]
+        if is_integer:
+            randint = rng.randint
+            return lambda k, batch: [randint(low, high) for _ in range(k)]
+        uniform = rng.uniform
+        return lambda k, batch: [uniform(low, high) for _ in range(k)]
+
+    if kind == "normal":
+        gauss = rng.gauss
+        mean, stddev = column["mean"], column["stddev"]
+        low = column.get("min", float("-inf"))
+        high = column.get("max", float("inf"))
+        if is_integer:
+            return lambda k, batch: [int(min(high, max(low, round(gauss(mean, stddev))))) for _ in range(k)]
+        return lambda k, batch: [min(high, max(low, gauss(mean, stddev))) for _ in range(k)]
+
+    if kind == "categorical":
+        values = list(column["values"])
+        cum_weights = list(accumulate(column["values"].values()))
+        return lambda k, batch: rng.choices(values, cum_weights=cum_weights, k=k)
+
+    if kind in ("zipf", "foreign_key"):
+        if kind == "foreign_key":
+            parent = column["references"]
+            if parent not in row_counts:
+                raise ValueError(
+                    f"{table}.{column['name']} references {parent!r}, "
+                    "which must be defined earlier in the spec"
+                )
+            n, s = row_counts[parent], column.get("skew", 0)
+            if not s:
+                randint = rng.randint
+                return lambda k, batch: [randint(1, n) for _ in range(k)]
+        else:
+            n, s = column["n"], column.get("s", 1.0)
+        draw = zipf_sampler(rng, n, s)
+        source = column.get("correlate_with")
+        if source is None:
+            return lambda k, batch: [draw() for _ in range(k)]
+        # Each source value rotates the skewed ranks by its own (hashed) offset,
+        # so its favourite parents differ from everyone else's.
+        return lambda k, batch: [
+            (value * 2654435761 + draw() - 1) % n + 1 for value in batch[source]
+        ]
+
+    raise ValueError(f"Unknown distribution {kind!r} for column {table}.{column['name']}")
+
+
+def column_definition(column):
+    if column.get("distribution") == "foreign_key":
+        return f"{column['name']} INTEGER NOT NULL REFERENCES {column['references']}(id)"
+    return f"{column['name']} {column.get('type', 'INTEGER').upper()} NOT NULL"
+
+
+def validate_identifier(identifier, kind):
+    """Allow only simple SQL identifiers in the generated statements."""
+    if not isinstance(identifier, str) or not IDENTIFIER_RE.fullmatch(identifier):
+        raise ValueError(f"Invalid {kind} in spec: {identifier!r}")
+    return identifier
+
+
+def validate_spec(spec):
+    """Raise ValueError for names or types that cannot be put into the generated SQL."""
+    probe = sqlite3.connect(":memory:")
+    for table in spec["tables"]:
+        validate_identifier(table["name"], "table name")
+        names = [table["name"]] + [column["name"] for column in table["columns"]]
+        for position, column in enumerate(table["columns"]):
+            validate_identifier(column["name"], "column name")
+            column_type = column.get("type", "INTEGER")
+            if str(column_type).upper() not in COLUMN_TYPES:
+                raise ValueError(f"Invalid column type {column_type!r} for {table['name']}.{column['name']}")
+            if column.get("distribution") == "foreign_key":
+                validate_identifier(column["references"], "table name")
+            if "correlate_with" in column:
+                earlier = [c["name"] for c in table["columns"][:position]]
+                if column.get("distribution") != "foreign_key" or not column.get("skew"):
+                    raise ValueError(f"{table['name']}.{column['name']}: correlate_with needs a "
+                                     "skewed foreign_key (a uniform draw has no favourites)")
+                if column["correlate_with"] not in earlier:
+                    raise ValueError(f"{table['name']}.{column['name']} correlates with "
+                                     f"{column['correlate_with']!r}, which must be an earlier column")
+        # Keywords such as ORDER match the identifier pattern but break the DDL; ask SQLite.
+        try:
+            probe.execute(f"CREATE TEMP TABLE {table['name']} (x);")
+            probe.execute(f"DROP TABLE {table['name']};")
+            for name in names[1:]:
+                probe.execute(f"SELECT 1 AS {name};")
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Reserved word in spec for table {table['name']!r}: {e}") from None
+        for index in table.get("indexes", []):
+            for name in index:
+                if name not in names[1:]:
+                    raise ValueError(f"Index column {name!r} is not a column of {table['name']}")
+
+
+def load_table(conn, table, seed, row_counts, scale=1.0, batch_size=10_000):
+    """Create one table and stream its generated rows into it; return rows/s."""
+    name = table["name"]
+    num_rows = max(1, int(table["rows"] * scale))
+    columns = table["columns"]
+    samplers = [make_sampler(name, column, seed, row_counts) for column in columns]
+
+    definitions = ",\n    ".join(["id INTEGER PRIMARY KEY"] + [column_definition(c) for c in columns])
+    conn.execute(f"DROP TABLE IF EXISTS {name};")
+    conn.execute(f"CREATE TABLE {name} (\n    {definitions}\n);")
+
+    column_names = ", ".join(["id"] + [column["name"] for column in columns])
+    placeholders = ", ".join("?" * (len(columns) + 1))
+    insert_sql = f"INSERT INTO {name} ({column_names}) VALUES ({placeholders});"
+
+    started_at = time.perf_counter()
+    for start in range(0, num_rows, batch_size):
+        k = min(batch_size, num_rows - start)
+        ids = range(start + 1, start + k + 1)
+        batch = {}
+        for column, sample in zip(columns, samplers):
+            batch[column["name"]] = sample(k, batch)
+        conn.executemany(insert_sql, zip(ids, *batch.values()))
+    conn.commit()
+    elapsed = time.perf_counter() - started_at
+
+    row_counts[name] = num_rows
+    print(f"[Load] {name:<12} {num_rows:>13,} rows  {num_rows / elapsed:>12,.0f} rows/s", flush=True)
+    return num_rows / elapsed
+
+
+def build_indexes(conn, spec):
+    """Create the spec's secondary indexes after all data is loaded, then ANALYZE."""
+    started_at = time.perf_counter()
+    for table in spec["tables"]:
+        for index in table.get("indexes", []):
+            index_name = f"idx_{table['name']}_{'_'.join(index)}"
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table['name']} ({', '.join(index)});"
+            )
+            print(f"[Index] {index_name}", flush=True)
+    conn.execute("ANALYZE;")
+    conn.commit()
+    print(f"[Index] Built in {time.perf_counter() - started_at:.2f}s", flush=True)
+
+
+def generate(database, spec, seed=42, scale=1.0, batch_size=10_000, profile="bulk_load"):
+    """Generate every table of the spec into database (replacing the file)."""
+    validate_spec(spec)
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+
+    conn = sqlite3.connect(database)
+    apply_pragma_profile(conn, profile)
+    print(f"[Setup] {database}: seed={seed}, scale={scale}, pragma profile={profile}", flush=True)
+
+    row_counts = {}
+    for table in spec["tables"]:
+        load_table(conn, table, seed, row_counts, scale, batch_size)
+    build_indexes(conn, spec)
+    return conn
+
+
+def show_skew(conn, spec):
+    """Print how much of each foreign key column the top 1% of parents account for."""
+    for table in spec["tables"]:
+        for column in table["columns"]:
+            if column.get("distribution") != "foreign_key":
+                continue
+            name, parent = column["name"], column["references"]
+            parents, = conn.execute(f"SELECT count(*) FROM {parent};").fetchone()
+            top = max(1, parents // 100)
+            total, = conn.execute(f"SELECT count(*) FROM {table['name']};").fetchone()
+            top_rows, = conn.execute(
+                f"SELECT sum(n) FROM (SELECT count(*) AS n FROM {table['name']} "
+                f"GROUP BY {name} ORDER BY n DESC LIMIT ?);",
+                (top,),
+            ).fetchone()
+            print(f"[Skew] top 1% of {parent} own {top_rows / total:6.1%} of {table['name']}.{name}")
+            source = column.get("correlate_with")
+            if source:
+                # Without correlation every source value would share the same favourite.
+                sources, favourites = conn.execute(
+                    f"SELECT count(*), count(DISTINCT favourite) FROM ("
+                    f"SELECT {source}, {name} AS favourite, max(n) FROM (SELECT {source}, {name}, "
+                    f"count(*) AS n FROM {table['name']} GROUP BY {source}, {name}) GROUP BY {source});"
+                ).fetchone()
+                print(f"[Correlation] {sources:,} {source} values have {favourites:,} different "
+                      f"favourite {name} values")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate skewed synthetic data from a spec")
+    parser.add_argument('--database', default=DB, help='SQLite file to (re)create')
+    parser.add_argument('--spec', help='JSON spec file (defaults to the built-in demo spec)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for reproducible data')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every table\'s row count')
+    parser.add_argument('--batch-size', type=int, default=10_000, help='Rows per executemany batch')
+    parser.add_argument(
+        '--pragma-profile', choices=sorted(PRAGMA_PROFILES), default='bulk_load',
+        help='PRAGMA settings used during the load'
+    )
+    args = parser.parse_args()
+
+    spec = DEMO_SPEC
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+
+    conn = generate(args.database, spec, args.seed, args.scale, args.batch_size, args.pragma_profile)
+    show_skew(conn, spec)
+    conn.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Timestamp Storage Layouts: TEXT vs Integer Epoch
+
+Goal: Compare file size and time-range query latency of the example_table
+      layouts defined in create_mock_db.py.
+
+Concept:
+- text:            'YYYY-MM-DD HH:MM:SS.ffffff' strings (26 bytes), no index,
+                   so every range query scans the whole table.
+- text_indexed:    the same strings with a secondary index on timestamp.
+- epoch:           microseconds since 1970 as INTEGER (at most 8 bytes) with a
+                   secondary index; a range is an index SEARCH plus rowid lookups.
+- epoch_clustered: WITHOUT ROWID table keyed on (timestamp, id); the rows are
+                   stored in time order, so a range is one contiguous B-tree walk.
+
+Usage:
+    python sqlite/timestamp_layouts.py
+    python sqlite/timestamp_layouts.py --rows 5000000 --queries 200
+"""
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+import argparse
+import io
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from create_mock_db import TABLE_LAYOUTS, append_rows, create_indexes, create_table, range_query
+
+BASE = datetime(2024, 1, 1)
+
+# Width of the queried windows; rows are 1 microsecond apart.
+WINDOWS = {
+    "1 ms": timedelta(milliseconds=1),
+    "100 ms": timedelta(milliseconds=100),
+}
+
+
+def build(path, layout, num_rows):
+    """Create a database with num_rows rows in the given layout; return load seconds."""
+    conn = sqlite3.connect(path)
+    started_at = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        create_table(conn, layout)
+        append_rows(conn, num_rows, base=BASE, batch_size=10_000, layout=layout)
+    create_indexes(conn, layout)
+    conn.execute("VACUUM;")
+    conn.close()
+    return time.perf_counter() - started_at
+
+
+def measure(path, layout, num_rows, queries, seed=0):
+    """Median latency in ms of random range queries for each window width."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    results = {}
+    for label, width in WINDOWS.items():
+        span_us = max(1, num_rows - width // timedelta(microseconds=1))
+        latencies = []
+        expected = min(num_rows, width // timedelta(microseconds=1))
+        for _ in range(queries):
+            start = BASE + timedelta(microseconds=rng.randrange(span_us))
+            sql, params = range_query(layout, start, start + width)
+            started_at = time.perf_counter()
+            rows = conn.execute(sql, params).fetchall()
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            assert len(rows) == expected, (layout, len(rows), expected)
+        results[label] = statistics.median(latencies)
+
+    sql, params = range_query(layout, BASE, BASE + timedelta(milliseconds=1))
+    plan = "; ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    conn.close()
+    return results, plan
+
+
+def main(num_rows, queries):
+    print(f"[Setup] {num_rows:,} rows per layout, {queries} queries per window\n", flush=True)
+    header = f"{'layout':<16} {'file size':>12} {'load':>8}"
+    header += "".join(f" {label + ' range':>14}" for label in WINDOWS)
+    print(header)
+
+    plans = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for layout in TABLE_LAYOUTS:
+            path = os.path.join(tmp_dir, f"{layout}.db")
+            load_secs = build(path, layout, num_rows)
+            latencies, plans[layout] = measure(path, layout, num_rows, queries)
+            line = f"{layout:<16} {os.path.getsize(path) / 2**20:>9.1f} MiB {load_secs:>7.2f}s"
+            line += "".join(f" {latencies[label]:>11.3f} ms" for label in WINDOWS)
+            print(line, flush=True)
+
+    print("\n[Plan] Query plan of a range query per layout:")
+    for layout, plan in plans.items():
+        print(f"  {layout:<16} {plan}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare TEXT and integer-epoch timestamp layouts")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows per layout')
+    parser.add_argument('--queries', type=int, default=50, help='Range queries per window width')
+    args = parser.parse_args()
+    main(args.rows, args.queries)